@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Drive the Streamlit app headlessly (AppTest) with N simultaneous Data Entry form submissions.
+
+Each session runs in its own process: AppTest keeps per-run state in process globals, so sessions
+cannot safely share threads. A barrier releases all sessions at once after their first render.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import multiprocessing
+import threading
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+APP_PATH = PROJECT_ROOT / "streamlit_avs_registry_app.py"
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from synthetic_registry import DEFAULT_SEED, write_registry  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent Streamlit form-submission load test")
+    parser.add_argument("--sessions", type=int, default=8, help="Simultaneous app sessions submitting the form")
+    parser.add_argument("--submissions", type=int, default=1, help="Form submissions per session")
+    parser.add_argument("--rows", type=int, default=1000, help="Synthetic registry size before the test")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Synthetic registry seed")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-run AppTest timeout (seconds)")
+    parser.add_argument("--output", type=Path, default=None, help="Optional path for the JSON result")
+    return parser.parse_args()
+
+
+def _failed_session(session_id: int, first_render_s: float | None, exceptions: list[str]) -> dict[str, Any]:
+    return {
+        "session": session_id,
+        "first_render_s": first_render_s,
+        "submit_s": [],
+        "saved_reported": 0,
+        "exceptions": exceptions,
+    }
+
+
+def _session(data_path: Path, session_id: int, submissions: int, timeout: float, barrier: Any) -> dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        at.session_state["registry_csv_path"] = str(data_path)
+        at.run()
+    except Exception as exc:
+        # Break the barrier so the other sessions stop waiting for this one.
+        barrier.abort()
+        return _failed_session(session_id, None, [f"first render failed: {exc}"])
+    first_render_s = time.perf_counter() - started
+    try:
+        # Sessions start rendering together, so twice the render timeout bounds how long any one waits.
+        barrier.wait(timeout=2 * timeout)
+    except threading.BrokenBarrierError:
+        return _failed_session(session_id, first_render_s, ["another session failed before the synchronized start"])
+    if at.exception:
+        return _failed_session(session_id, first_render_s, [str(exc.value) for exc in at.exception])
+
+    submit_times = []
+    saved = 0
+    for n in range(submissions):
+        text_inputs = {widget.label: widget for widget in at.text_input}
+        text_inputs["Patient Study Code*"].set_value(f"LOADTEST_{session_id:03d}_{n:03d}")
+        text_inputs["Primary Operator*"].set_value(f"Load Operator {session_id}")
+        submit = next(button for button in at.button if button.label == "Save Case")
+        started = time.perf_counter()
+        submit.click().run()
+        submit_times.append(time.perf_counter() - started)
+        saved += sum(1 for message in at.success if "Saved case" in message.value)
+    return {
+        "session": session_id,
+        "first_render_s": first_render_s,
+        "submit_s": submit_times,
+        "saved_reported": saved,
+        "exceptions": [str(exc.value) for exc in at.exception],
+    }
+
+
+def run_app_load_test(
+    sessions: int, submissions: int, rows: int, seed: int, timeout: float, workdir: Path
+) -> dict[str, Any]:
+    data_path = workdir / "avs_registry.csv"
+    write_registry(data_path, rows, seed=seed)
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        barrier = manager.Barrier(sessions)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=sessions, mp_context=context) as pool:
+            futures = [
+                pool.submit(_session, data_path, session_id, submissions, timeout, barrier)
+                for session_id in range(sessions)
+            ]
+            results = [future.result() for future in futures]
+        wall_s = time.perf_counter() - started
+
+    submit_times = sorted(t for result in results for t in result["submit_s"])
+    renders = [r["first_render_s"] for r in results if r["first_render_s"] is not None]
+    expected = sessions * submissions
+    persisted = len(pd.read_csv(data_path)) - rows
+    return {
+        "sessions": sessions,
+        "submissions_per_session": submissions,
+        "registry_rows_before": rows,
+        "wall_time_s": round(wall_s, 3),
+        "submissions_expected": expected,
+        "submissions_reported_saved": sum(result["saved_reported"] for result in results),
+        "rows_persisted": persisted,
+        "lost_writes": expected - persisted,
+        "submit_s_median": round(statistics.median(submit_times), 4) if submit_times else None,
+        "submit_s_max": round(max(submit_times), 4) if submit_times else None,
+        "first_render_s_median": round(statistics.median(renders), 4) if renders else None,
+        "exceptions": [exc for result in results for exc in result["exceptions"]],
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="avs_app_load_") as tmp:
+        result = run_app_load_test(args.sessions, args.submissions, args.rows, args.seed, args.timeout, Path(tmp))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Time AVS registry hot paths across synthetic registry sizes and write comparable JSON results."""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from reporting.generate_descriptive_report import (  # noqa: E402
+    generate_descriptive_report,
+    load_and_type,
+    summary_table,
+)
+from notes_index import delta_path_for, index_path_for, load_or_build_index  # noqa: E402
+from registry_cube import cube_path_for, load_or_build_cube, registry_signature  # noqa: E402
+from streamlit_avs_registry_app import (  # noqa: E402
+    append_row,
+    filter_by_date,
+    load_data,
+    row_from_form,
+    typed_frame,
+    validate_entry,
+)
+from synthetic_registry import DEFAULT_SEED, write_registry  # noqa: E402
+
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "benchmarks" / "results"
+DEFAULT_DATA_DIR = PROJECT_ROOT / "benchmarks" / "data"
+VALIDATE_CALLS = 1000
+REGRESSION_THRESHOLD = 1.25
+
+SAMPLE_FORM: dict[str, Any] = {
+    "patient_code": "BENCH_0001",
+    "age_years": 52,
+    "sex": "Female",
+    "bmi_kg_m2": 26.0,
+    "procedure_date": date(2025, 6, 1),
+    "operator_name": "Operator A",
+    "referring_service": "Endocrinology",
+    "aldo_ivc": 20.0,
+    "cort_ivc": 10.0,
+    "aldo_r": 100.0,
+    "cort_r": 20.0,
+    "aldo_l": 100.0,
+    "cort_l": 20.0,
+    "si_r": 2.0,
+    "si_l": 2.0,
+    "li": 4.0,
+    "cosyntropin_used": True,
+    "cosyntropin_route": "infusion",
+    "cosyntropin_dose": "50",
+    "contralateral_suppression": None,
+    "final_interpretation": "Unilateral left",
+    "management_plan": "Left adrenalectomy",
+    "bp_improved_3m": None,
+    "k_normalized_3m": None,
+    "complication": False,
+    "notes": "Benchmark record.",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark AVS registry operations across registry sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Registry row counts")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repeats per operation")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Synthetic registry seed")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Cache for generated registries")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Result JSON path (default: benchmarks/results/benchmark_<timestamp>.json)",
+    )
+    parser.add_argument("--label", default="", help="Free-text label stored with the results (e.g. branch name)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result JSON to compare against")
+    return parser.parse_args()
+
+
+def _git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _time(fn: Callable[[], Any], repeats: int, setup: Callable[[], Any] | None = None) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def registry_for_size(data_dir: Path, n_rows: int, seed: int) -> Path:
+    path = data_dir / f"avs_registry_synthetic_{n_rows}_{seed}.csv"
+    if not path.exists():
+        write_registry(path, n_rows, seed=seed)
+    return path
+
+
+def benchmark_size(registry: Path, n_rows: int, repeats: int, workdir: Path) -> list[dict[str, Any]]:
+    raw = load_data(registry)
+    typed = typed_frame(raw)
+    report_frame = load_and_type(registry)
+    dates = typed["procedure_date"].dropna().sort_values()
+    start_date = dates.iloc[len(dates) // 4].date()
+    end_date = dates.iloc[3 * len(dates) // 4].date()
+    row = row_from_form(SAMPLE_FORM)
+    append_target = workdir / "append_target.csv"
+
+    def reset_append_target() -> None:
+        shutil.copyfile(registry, append_target)
+        for sidecar in (cube_path_for(append_target), index_path_for(append_target), delta_path_for(append_target)):
+            sidecar.unlink(missing_ok=True)
+
+    def reset_append_target_with_sidecars() -> None:
+        # Real app registries carry cube and search-index sidecars that every append keeps current.
+        reset_append_target()
+        signature = registry_signature(append_target)
+        target = load_data(append_target)
+        load_or_build_cube(append_target, typed_frame(target), signature)
+        load_or_build_index(append_target, target, signature)
+
+    def validate_many() -> None:
+        for _ in range(VALIDATE_CALLS):
+            validate_entry(row)
+
+    operations: dict[str, tuple[Callable[[], Any], Callable[[], Any] | None, int]] = {
+        "load_data": (lambda: load_data(registry), None, 1),
+        "typed_frame": (lambda: typed_frame(raw), None, 1),
+        "append_row": (lambda: append_row(append_target, row), reset_append_target, 1),
+        "append_row_with_sidecars": (lambda: append_row(append_target, row), reset_append_target_with_sidecars, 1),
+        "validate_entry": (validate_many, None, VALIDATE_CALLS),
+        "dashboard_filter": (lambda: filter_by_date(typed, start_date, end_date), None, 1),
+        "summary_table": (lambda: summary_table(report_frame), None, 1),
+        "generate_descriptive_report": (
+            lambda: generate_descriptive_report(input_csv=registry, outdir_root=workdir / "reports"),
+            None,
+            1,
+        ),
+    }
+
+    results = []
+    for name, (fn, setup, calls) in operations.items():
+        timings = [t / calls for t in _time(fn, repeats, setup)]
+        results.append(
+            {
+                "operation": name,
+                "rows": n_rows,
+                "repeats": repeats,
+                "calls_per_repeat": calls,
+                "seconds_min": min(timings),
+                "seconds_median": statistics.median(timings),
+                "seconds_max": max(timings),
+            }
+        )
+        print(f"{n_rows:>9} rows  {name:<28} median {statistics.median(timings):.6f}s")
+    return results
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any]) -> list[dict[str, Any]]:
+    """Pair results by (operation, rows) and report the median-time ratio current/baseline."""
+    previous = {(r["operation"], r["rows"]): r for r in baseline.get("results", [])}
+    rows = []
+    for result in current["results"]:
+        before = previous.get((result["operation"], result["rows"]))
+        if before is None or not before["seconds_median"]:
+            continue
+        ratio = result["seconds_median"] / before["seconds_median"]
+        rows.append(
+            {
+                "operation": result["operation"],
+                "rows": result["rows"],
+                "baseline_s": before["seconds_median"],
+                "current_s": result["seconds_median"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > REGRESSION_THRESHOLD,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    args = parse_args()
+    output = args.output or DEFAULT_OUTPUT_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="avs_bench_") as tmp:
+        for n_rows in args.sizes:
+            registry = registry_for_size(args.data_dir, n_rows, args.seed)
+            results.extend(benchmark_size(registry, n_rows, args.repeats, Path(tmp)))
+
+    payload: dict[str, Any] = {
+        "meta": {
+            "label": args.label,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        payload["comparison"] = {"baseline": str(args.compare), "rows": compare_results(baseline, payload)}
+        for row in payload["comparison"]["rows"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['rows']:>9} rows  {row['operation']:<28} x{row['ratio']:.3f}{flag}")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Wrote benchmark results to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Generate seeded synthetic AVS registry CSVs with realistic field distributions."""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from streamlit_avs_registry_app import CSV_COLUMNS  # noqa: E402
+
+
+DEFAULT_SEED = 20240601
+# Fixed default end date so a given seed always yields the same registry.
+DEFAULT_END_DATE = date(2025, 12, 31)
+DEFAULT_YEARS = 10
+
+OPERATORS = ["Operator A", "Operator B", "Operator C", "Operator D", "Operator E", "Fellow F"]
+OPERATOR_WEIGHTS = [0.28, 0.24, 0.18, 0.14, 0.10, 0.06]
+SERVICES = ["Endocrinology", "Nephrology", "Internal Medicine", "Cardiology", "Hypertension Clinic"]
+SERVICE_WEIGHTS = [0.70, 0.10, 0.10, 0.05, 0.05]
+
+NOTE_PHRASES = np.array(
+    [
+        "Sequential sampling with both adrenal veins cannulated.",
+        "Right adrenal vein cannulation difficult; multiple catheter exchanges.",
+        "Left sample obtained from common trunk with inferior phrenic vein.",
+        "Cosyntropin infusion started 30 minutes before sampling.",
+        "CT showed left adrenal nodule; AVS for lateralization.",
+        "Discussed at MDT; surgical referral placed.",
+        "Minor groin hematoma managed with manual compression.",
+        "Patient on spironolactone washout before sampling.",
+        "Follow-up potassium normal on reduced medications.",
+        "Blood pressure improved; antihypertensives reduced.",
+        "Repeat sampling recommended due to low right selectivity.",
+        "Bilateral disease suspected; continue mineralocorticoid antagonist.",
+    ]
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic AVS registry CSV")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of records (1k to 1M typical)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("projects/avs_registry/benchmarks/data/avs_registry_synthetic.csv"),
+        help="Output CSV path",
+    )
+    return parser.parse_args()
+
+
+def _yes_no_unknown(rng: np.random.Generator, n: int, p_yes: float, p_unknown: float) -> np.ndarray:
+    draw = rng.random(n)
+    return np.where(draw < p_unknown, "Unknown", np.where(draw < p_unknown + p_yes, "Yes", "No"))
+
+
+def generate_registry(
+    n_rows: int,
+    seed: int = DEFAULT_SEED,
+    end_date: date = DEFAULT_END_DATE,
+    years: int = DEFAULT_YEARS,
+) -> pd.DataFrame:
+    """Return ``n_rows`` synthetic registry records with columns in ``CSV_COLUMNS`` order."""
+    rng = np.random.default_rng(seed)
+    n = n_rows
+
+    start = np.datetime64(end_date - timedelta(days=365 * years))
+    proc_dates = start + rng.integers(0, 365 * years + 1, n).astype("timedelta64[D]")
+    entry_times = (
+        proc_dates.astype("datetime64[s]")
+        + rng.integers(0, 14 * 86400, n).astype("timedelta64[s]")
+    )
+    proc_date_str = pd.Series(np.datetime_as_string(proc_dates, unit="D"))
+
+    # Roughly 3% of procedures are repeat AVS for an existing patient.
+    patient_ids = np.arange(n)
+    repeats = rng.random(n) < 0.03
+    patient_ids[repeats] = rng.integers(0, max(n, 1), repeats.sum())
+    record_suffix = pd.Series(rng.choice(16**8, n, replace=False)).map("{:08x}".format)
+
+    sex = rng.choice(["Female", "Male", "Other"], n, p=[0.45, 0.54, 0.01])
+    age = np.clip(np.round(rng.normal(52, 11, n)), 18, 90).astype(int)
+    bmi = np.round(np.clip(rng.normal(29, 5, n), 16, 55), 1)
+
+    cosyntropin = _yes_no_unknown(rng, n, p_yes=0.60, p_unknown=0.05)
+    stimulated = cosyntropin == "Yes"
+    route = np.where(stimulated, rng.choice(["infusion", "bolus"], n, p=[0.7, 0.3]), "unknown")
+    dose = np.where(stimulated, np.where(route == "bolus", 250.0, 50.0), np.nan)
+
+    # Hormone physiology: cortisol step-up defines selectivity, aldosterone/cortisol ratios define lateralization.
+    cort_ivc = np.round(rng.lognormal(np.log(np.where(stimulated, 25, 14)), 0.3), 1)
+    aldo_ivc = np.round(rng.lognormal(np.log(25), 0.5, n), 1)
+    si_right = rng.lognormal(np.log(np.where(stimulated, 15, 5)), 0.6)
+    si_left = rng.lognormal(np.log(np.where(stimulated, 15, 5)), 0.6)
+    failed = rng.random(n) < 0.08
+    failed_side_right = rng.random(n) < 0.7
+    si_right = np.where(failed & failed_side_right, rng.uniform(0.8, 1.9, n), si_right)
+    si_left = np.where(failed & ~failed_side_right, rng.uniform(0.8, 1.9, n), si_left)
+    cort_right = np.round(cort_ivc * si_right, 1)
+    cort_left = np.round(cort_ivc * si_left, 1)
+
+    unilateral = rng.random(n) < 0.5
+    dominant_right = rng.random(n) < 0.5
+    li_true = np.where(unilateral, rng.lognormal(np.log(9), 0.5, n), rng.lognormal(np.log(1.6), 0.35, n))
+    ac_ivc = aldo_ivc / cort_ivc
+    ac_low = ac_ivc * rng.lognormal(np.where(unilateral, np.log(0.6), 0.0), 0.3)
+    ac_high = ac_low * li_true
+    ac_right = np.where(dominant_right, ac_high, ac_low)
+    ac_left = np.where(dominant_right, ac_low, ac_high)
+    aldo_right = np.round(ac_right * cort_right, 1)
+    aldo_left = np.round(ac_left * cort_left, 1)
+    ratio_right = aldo_right / cort_right
+    ratio_left = aldo_left / cort_left
+    li = np.round(np.maximum(ratio_right, ratio_left) / np.minimum(ratio_right, ratio_left), 2)
+    suppressed = np.minimum(ratio_right, ratio_left) < ac_ivc
+
+    non_diagnostic = (si_right < 2.0) | (si_left < 2.0)
+    interpretation = np.select(
+        [non_diagnostic, li >= 4.0, li < 3.0],
+        [
+            "Non-diagnostic",
+            np.where(ratio_right > ratio_left, "Unilateral right", "Unilateral left"),
+            "Bilateral hypersecretion",
+        ],
+        default="Indeterminate",
+    )
+
+    plan_draw = rng.random(n)
+    plan = np.select(
+        [
+            interpretation == "Unilateral right",
+            interpretation == "Unilateral left",
+            interpretation == "Bilateral hypersecretion",
+            interpretation == "Non-diagnostic",
+        ],
+        [
+            np.where(plan_draw < 0.85, "Right adrenalectomy", "Medical therapy"),
+            np.where(plan_draw < 0.85, "Left adrenalectomy", "Medical therapy"),
+            np.where(plan_draw < 0.95, "Medical therapy", "Pending MDT decision"),
+            np.where(plan_draw < 0.7, "Repeat AVS", "Pending MDT decision"),
+        ],
+        default=np.where(plan_draw < 0.6, "Pending MDT decision", "Medical therapy"),
+    )
+
+    # 3-month outcomes exist only once follow-up is due.
+    follow_up_due = proc_dates + np.timedelta64(120, "D") <= np.datetime64(end_date)
+    bp_improved = np.where(follow_up_due, _yes_no_unknown(rng, n, p_yes=0.65, p_unknown=0.15), "Unknown")
+    k_normalized = np.where(follow_up_due, _yes_no_unknown(rng, n, p_yes=0.75, p_unknown=0.15), "Unknown")
+
+    notes = pd.Series(NOTE_PHRASES[rng.integers(0, len(NOTE_PHRASES), n)]) + " " + pd.Series(
+        NOTE_PHRASES[rng.integers(0, len(NOTE_PHRASES), n)]
+    )
+
+    df = pd.DataFrame(
+        {
+            "record_id": "avs_" + proc_date_str.str.replace("-", "", regex=False) + "_" + record_suffix,
+            "entry_timestamp": np.datetime_as_string(entry_times, unit="s"),
+            "patient_code": pd.Series(patient_ids).map("AVS_{:07d}".format),
+            "age_years": age,
+            "sex": sex,
+            "bmi_kg_m2": bmi,
+            "procedure_date": proc_date_str,
+            "operator_name": rng.choice(OPERATORS, n, p=OPERATOR_WEIGHTS),
+            "referring_service": rng.choice(SERVICES, n, p=SERVICE_WEIGHTS),
+            "aldosterone_ng_dl_ivc": aldo_ivc,
+            "cortisol_ug_dl_ivc": cort_ivc,
+            "aldosterone_ng_dl_right": aldo_right,
+            "cortisol_ug_dl_right": cort_right,
+            "aldosterone_ng_dl_left": aldo_left,
+            "cortisol_ug_dl_left": cort_left,
+            "selectivity_index_right": np.round(si_right, 2),
+            "selectivity_index_left": np.round(si_left, 2),
+            "lateralization_index": li,
+            "cosyntropin_used": cosyntropin,
+            "cosyntropin_route": route,
+            "cosyntropin_dose": dose,
+            "contralateral_suppression": np.where(non_diagnostic, "Unknown", np.where(suppressed, "Yes", "No")),
+            "final_interpretation": interpretation,
+            "management_plan": plan,
+            "bp_improved_3m": bp_improved,
+            "k_normalized_3m": k_normalized,
+            "complication": _yes_no_unknown(rng, n, p_yes=0.025, p_unknown=0.025),
+            "notes": notes,
+        }
+    )
+    return df[CSV_COLUMNS]
+
+
+def write_registry(path: Path, n_rows: int, seed: int = DEFAULT_SEED) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generate_registry(n_rows, seed=seed).to_csv(path, index=False)
+    return path
+
+
+def main() -> None:
+    args = parse_args()
+    path = write_registry(args.output, args.rows, seed=args.seed)
+    print(f"Wrote {args.rows} synthetic records to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Drive the local ingest service with concurrent JSON submissions and report latency/throughput."""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from ingest_service import DEFAULT_BATCH_MAX_ROWS, DEFAULT_BATCH_WINDOW_MS, create_server, percentile
+from streamlit_avs_registry_app import INTERPRETATION_OPTIONS, PLAN_OPTIONS, SEX_OPTIONS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the AVS ingest service")
+    parser.add_argument(
+        "--url",
+        default=None,
+        help="Base URL of a running service; if omitted, an in-process service is started on a temporary registry",
+    )
+    parser.add_argument("--requests", type=int, default=2000, help="Total POST requests to send")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client threads")
+    parser.add_argument("--bulk-size", type=int, default=1, help="Records per request")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for synthetic records")
+    parser.add_argument("--batch-max-rows", type=int, default=DEFAULT_BATCH_MAX_ROWS)
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW_MS)
+    parser.add_argument("--output", type=Path, default=None, help="Optional path for the JSON result")
+    return parser.parse_args()
+
+
+def synthetic_record(rng: random.Random, serial: int) -> dict[str, Any]:
+    interpretation = rng.choice(INTERPRETATION_OPTIONS)
+    plan = rng.choice(PLAN_OPTIONS)
+    if interpretation == "Non-diagnostic":
+        plan = rng.choice(["Repeat AVS", "Pending MDT decision"])
+    return {
+        "patient_code": f"LOAD_{serial:07d}",
+        "age_years": rng.randint(25, 80),
+        "sex": rng.choice(SEX_OPTIONS),
+        "procedure_date": (date.today() - timedelta(days=rng.randint(0, 3650))).isoformat(),
+        "operator_name": rng.choice(["Operator A", "Operator B", "Operator C"]),
+        "referring_service": "Endocrinology",
+        "aldo_r": round(rng.uniform(5, 2000), 1),
+        "cort_r": round(rng.uniform(5, 800), 1),
+        "aldo_l": round(rng.uniform(5, 2000), 1),
+        "cort_l": round(rng.uniform(5, 800), 1),
+        "si_r": round(rng.uniform(0.5, 30), 1),
+        "si_l": round(rng.uniform(0.5, 30), 1),
+        "li": round(rng.uniform(0.5, 20), 1),
+        "cosyntropin_used": rng.choice([True, False, None]),
+        "final_interpretation": interpretation,
+        "management_plan": plan,
+        "notes": "load generator record",
+    }
+
+
+def _post(url: str, payload: Any) -> int:
+    request = urllib.request.Request(
+        f"{url}/records",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def run_load(url: str, n_requests: int, concurrency: int, bulk_size: int, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    payloads = [
+        [synthetic_record(rng, i * bulk_size + j) for j in range(bulk_size)] for i in range(n_requests)
+    ]
+    latencies_ms: list[float] = []
+    statuses: dict[int, int] = {}
+    lock = threading.Lock()
+
+    def send(payload: list[dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        status = _post(url, payload if bulk_size > 1 else payload[0])
+        elapsed_ms = 1000.0 * (time.perf_counter() - started)
+        with lock:
+            latencies_ms.append(elapsed_ms)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, payloads))
+    wall_s = time.perf_counter() - started
+
+    latencies_ms.sort()
+    with urllib.request.urlopen(f"{url}/metrics", timeout=30) as response:
+        server_metrics = json.loads(response.read())
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "bulk_size": bulk_size,
+        "records_sent": n_requests * bulk_size,
+        "status_counts": {str(code): count for code, count in sorted(statuses.items())},
+        "wall_time_s": round(wall_s, 3),
+        "requests_per_second": round(n_requests / wall_s, 2),
+        "records_per_second": round(n_requests * bulk_size / wall_s, 2),
+        "latency_ms_p50": percentile(latencies_ms, 50),
+        "latency_ms_p99": percentile(latencies_ms, 99),
+        "server": server_metrics,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    server = writer = None
+    url = args.url
+    if url is None:
+        data_path = Path(tempfile.mkdtemp(prefix="avs_ingest_load_")) / "avs_registry.csv"
+        server, writer = create_server(
+            data_path,
+            port=0,
+            batch_max_rows=args.batch_max_rows,
+            batch_window_ms=args.batch_window_ms,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        print(f"Started in-process ingest service at {url} -> {data_path}")
+
+    try:
+        result = run_load(url.rstrip("/"), args.requests, args.concurrency, args.bulk_size, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            writer.stop()
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output is not None:
+        args.output.write_text(text, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""Local HTTP ingest service: validate JSON AVS records and coalesce them into batched registry appends."""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from collections import deque
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from streamlit_avs_registry_app import (
+    DEFAULT_DATA_PATH,
+    INTERPRETATION_OPTIONS,
+    PLAN_OPTIONS,
+    SEX_OPTIONS,
+    append_rows,
+    row_from_form,
+    validate_entry,
+)
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_MAX_ROWS = 500
+DEFAULT_BATCH_WINDOW_MS = 50.0
+MAX_BODY_BYTES = 10 * 1024 * 1024
+LATENCY_WINDOW = 10000
+
+REQUIRED_FIELDS = [
+    "patient_code",
+    "age_years",
+    "sex",
+    "procedure_date",
+    "operator_name",
+    "final_interpretation",
+    "management_plan",
+]
+
+# Optional fields use the same keys as the Streamlit entry form (see ``row_from_form``).
+OPTIONAL_FIELD_DEFAULTS: dict[str, Any] = {
+    "bmi_kg_m2": None,
+    "referring_service": "",
+    "aldo_ivc": None,
+    "cort_ivc": None,
+    "aldo_r": None,
+    "cort_r": None,
+    "aldo_l": None,
+    "cort_l": None,
+    "si_r": None,
+    "si_l": None,
+    "li": None,
+    "cosyntropin_used": None,
+    "cosyntropin_route": "unknown",
+    "cosyntropin_dose": "",
+    "contralateral_suppression": None,
+    "bp_improved_3m": None,
+    "k_normalized_3m": None,
+    "complication": None,
+    "notes": "",
+}
+
+YES_NO_FIELDS = [
+    "cosyntropin_used",
+    "contralateral_suppression",
+    "bp_improved_3m",
+    "k_normalized_3m",
+    "complication",
+]
+
+# Form keys that ``row_from_form`` converts with ``safe_number``; anything it cannot parse is rejected.
+NUMERIC_FIELDS = [
+    "bmi_kg_m2",
+    "aldo_ivc",
+    "cort_ivc",
+    "aldo_r",
+    "cort_r",
+    "aldo_l",
+    "cort_l",
+    "si_r",
+    "si_l",
+    "li",
+    "cosyntropin_dose",
+]
+
+# Free-text form keys; ``row_from_form`` would otherwise stringify lists or objects verbatim.
+TEXT_FIELDS = ["patient_code", "operator_name", "referring_service", "notes"]
+
+CHOICE_FIELDS = {
+    "sex": SEX_OPTIONS,
+    "final_interpretation": INTERPRETATION_OPTIONS,
+    "management_plan": PLAN_OPTIONS,
+    "cosyntropin_route": ["infusion", "bolus", "other", "unknown"],
+}
+
+
+def _is_number(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    try:
+        return math.isfinite(float(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _as_integer(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value.strip())
+    return None
+
+
+def record_to_row(record: Any) -> tuple[dict[str, Any] | None, list[str]]:
+    """Convert one JSON record (entry-form keys) to a registry row, applying form validation."""
+    if not isinstance(record, dict):
+        return None, ["Record must be a JSON object."]
+
+    errors: list[str] = []
+    missing = [field for field in REQUIRED_FIELDS if record.get(field) in (None, "")]
+    if missing:
+        errors.append(f"Missing required field(s): {', '.join(missing)}.")
+    unknown = sorted(set(record) - set(REQUIRED_FIELDS) - set(OPTIONAL_FIELD_DEFAULTS))
+    if unknown:
+        errors.append(f"Unknown field(s): {', '.join(unknown)}.")
+    if errors:
+        return None, errors
+
+    # Explicit nulls mean "not recorded", the same as omitting the field.
+    form = {**OPTIONAL_FIELD_DEFAULTS, **{field: value for field, value in record.items() if value is not None}}
+    for field, options in CHOICE_FIELDS.items():
+        if form[field] not in options:
+            errors.append(f"{field} must be one of: {', '.join(options)}.")
+    for field in TEXT_FIELDS:
+        if not isinstance(form[field], str):
+            errors.append(f"{field} must be a string.")
+    for field in YES_NO_FIELDS:
+        # Identity checks: 1 == True, but ``to_yes_no`` would store 1 or 1.0 as "Unknown".
+        if not (form[field] is True or form[field] is False or form[field] is None):
+            errors.append(f"{field} must be true, false, or null.")
+    try:
+        form["procedure_date"] = date.fromisoformat(str(form["procedure_date"]))
+    except ValueError:
+        errors.append("procedure_date must be an ISO date (YYYY-MM-DD).")
+    age = _as_integer(form["age_years"])
+    if age is None:
+        errors.append("age_years must be an integer.")
+    else:
+        form["age_years"] = age
+    for field in NUMERIC_FIELDS:
+        if form[field] not in (None, "") and not _is_number(form[field]):
+            errors.append(f"{field} must be a number.")
+    if errors:
+        return None, errors
+
+    row = row_from_form(form)
+    errors = validate_entry(row)
+    return (None, errors) if errors else (row, [])
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, max(0, round(pct / 100.0 * (len(sorted_values) - 1))))
+    return round(sorted_values[rank], 3)
+
+
+class BatchedRegistryWriter:
+    """Single writer thread that coalesces queued submissions into one ``append_rows`` call per batch.
+
+    A batch closes when it reaches ``batch_max_rows`` or ``batch_window_s`` after its first submission.
+    ``submit`` blocks until the batch containing the rows has been written.
+    """
+
+    def __init__(self, data_path: Path, batch_max_rows: int, batch_window_s: float) -> None:
+        self.data_path = data_path
+        self.batch_max_rows = batch_max_rows
+        self.batch_window_s = batch_window_s
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="registry-writer", daemon=True)
+        self._lock = threading.Lock()
+        self._latencies_ms: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._rows_written = 0
+        self._batches = 0
+        self._started_at = time.perf_counter()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(self, rows: list[dict[str, Any]]) -> None:
+        pending = {"rows": rows, "done": threading.Event(), "error": None, "enqueued": time.perf_counter()}
+        self._queue.put(pending)
+        pending["done"].wait()
+        if pending["error"] is not None:
+            raise pending["error"]
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            n_rows = len(first["rows"])
+            deadline = time.perf_counter() + self.batch_window_s
+            while n_rows < self.batch_max_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                n_rows += len(item["rows"])
+            self._flush(batch)
+
+    def _flush(self, batch: list[dict[str, Any]]) -> None:
+        rows = [row for item in batch for row in item["rows"]]
+        error = None
+        try:
+            append_rows(self.data_path, rows)
+        except Exception as exc:
+            error = exc
+        finished = time.perf_counter()
+        with self._lock:
+            if error is None:
+                self._rows_written += len(rows)
+                self._batches += 1
+            for item in batch:
+                self._latencies_ms.append(1000.0 * (finished - item["enqueued"]))
+        for item in batch:
+            item["error"] = error
+            item["done"].set()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            rows_written = self._rows_written
+            batches = self._batches
+        elapsed = time.perf_counter() - self._started_at
+        return {
+            "rows_written": rows_written,
+            "batches": batches,
+            "mean_batch_rows": round(rows_written / batches, 2) if batches else None,
+            "write_latency_ms_p50": percentile(latencies, 50),
+            "write_latency_ms_p99": percentile(latencies, 99),
+            "rows_per_second": round(rows_written / elapsed, 2) if elapsed > 0 else None,
+            "uptime_s": round(elapsed, 3),
+        }
+
+
+class IngestRequestHandler(BaseHTTPRequestHandler):
+    server_version = "AVSIngest/1.0"
+    writer: BatchedRegistryWriter
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "data_path": str(self.writer.data_path)})
+        elif self.path == "/metrics":
+            self._send_json(200, self.writer.metrics())
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/records":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._send_json(400, {"error": "Content-Length must be an integer."})
+            return
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self._send_json(413 if length > MAX_BODY_BYTES else 400, {"error": "Request body missing or too large."})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send_json(400, {"error": "Request body is not valid JSON."})
+            return
+
+        # Accept a single record, a list of records, or {"records": [...]}.
+        if isinstance(payload, dict) and "records" in payload:
+            payload = payload["records"]
+        records = payload if isinstance(payload, list) else [payload]
+        if not records:
+            self._send_json(400, {"error": "No records supplied."})
+            return
+
+        rows: list[dict[str, Any]] = []
+        errors: list[dict[str, Any]] = []
+        for position, record in enumerate(records):
+            row, record_errors = record_to_row(record)
+            if record_errors:
+                errors.append({"index": position, "errors": record_errors})
+            else:
+                rows.append(row)
+        # Bulk submissions are all-or-nothing so a client can safely resend after fixing errors.
+        if errors:
+            self._send_json(422, {"saved": 0, "errors": errors})
+            return
+
+        try:
+            self.writer.submit(rows)
+        except Exception as exc:
+            self._send_json(500, {"error": f"Registry write failed: {exc}"})
+            return
+        self._send_json(201, {"saved": len(rows), "record_ids": [row["record_id"] for row in rows]})
+
+
+class IngestHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Concurrent clients connect in bursts; the socketserver default backlog of 5 resets them.
+    request_queue_size = 256
+
+
+def create_server(
+    data_path: Path,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    batch_max_rows: int = DEFAULT_BATCH_MAX_ROWS,
+    batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS,
+) -> tuple[IngestHTTPServer, BatchedRegistryWriter]:
+    writer = BatchedRegistryWriter(data_path, batch_max_rows, batch_window_ms / 1000.0)
+    handler = type("BoundIngestRequestHandler", (IngestRequestHandler,), {"writer": writer})
+    server = IngestHTTPServer((host, port), handler)
+    writer.start()
+    return server, writer
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run local AVS registry ingest service")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_PATH, help="Path to AVS registry CSV")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Bind address (keep on localhost)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Listen port")
+    parser.add_argument(
+        "--batch-max-rows", type=int, default=DEFAULT_BATCH_MAX_ROWS, help="Maximum rows per coalesced append"
+    )
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=DEFAULT_BATCH_WINDOW_MS,
+        help="How long a batch stays open for more submissions",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    server, writer = create_server(
+        data_path=args.data.expanduser(),
+        host=args.host,
+        port=args.port,
+        batch_max_rows=args.batch_max_rows,
+        batch_window_ms=args.batch_window_ms,
+    )
+    print(f"AVS ingest service listening on http://{args.host}:{args.port} -> {args.data}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        writer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Toggleable hot-path timing for the AVS registry app with JSON-lines and Prometheus textfile export.
+
+Records are buffered in memory and exported at most once per ``FLUSH_INTERVAL_S`` (or every
+``FLUSH_MAX_PENDING`` calls, and at exit). Each process writes its own Prometheus textfile with a
+``pid`` label, so the app and the ingest service never overwrite each other's counters; the file is
+removed when the process exits, after its records are flushed to the JSON-lines log.
+
+Peak memory uses tracemalloc, whose peak counter is process-wide: traced spans are serialized so
+concurrent sessions cannot reset each other's peaks, but allocations made by other threads outside
+any span still count towards the running span. Treat it as exact only for single-session use.
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pandas as pd
+
+
+DEFAULT_METRICS_DIR = Path(__file__).resolve().parent / "metrics"
+JSONL_NAME = "avs_metrics.jsonl"
+PROM_NAME_TEMPLATE = "avs_metrics_{pid}.prom"
+RECENT_CALLS = 5000
+FLUSH_INTERVAL_S = 1.0
+FLUSH_MAX_PENDING = 256
+ENV_FLAG = "AVS_INSTRUMENTATION"
+ENV_METRICS_DIR = "AVS_METRICS_DIR"
+
+
+class _State:
+    def __init__(self) -> None:
+        self.enabled = os.environ.get(ENV_FLAG, "").strip().lower() in {"1", "true", "yes", "on"}
+        self.trace_memory = False
+        self.metrics_dir = Path(os.environ.get(ENV_METRICS_DIR) or DEFAULT_METRICS_DIR)
+        self.lock = threading.Lock()
+        self.io_lock = threading.Lock()
+        # Held for the whole of an outermost traced span; re-entrant so nested spans can trace too.
+        self.trace_lock = threading.RLock()
+        self.recent: deque[dict[str, Any]] = deque(maxlen=RECENT_CALLS)
+        self.totals: dict[str, dict[str, float]] = {}
+        self.pending: list[dict[str, Any]] = []
+        self.last_flush = time.monotonic()
+        self.local = threading.local()
+
+
+_state = _State()
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def configure(
+    enabled: bool | None = None,
+    trace_memory: bool | None = None,
+    metrics_dir: Path | None = None,
+) -> None:
+    """Change instrumentation settings for this process; ``None`` leaves a setting unchanged."""
+    if enabled is not None:
+        _state.enabled = enabled
+    if trace_memory is not None:
+        _state.trace_memory = trace_memory
+    if metrics_dir is not None:
+        _state.metrics_dir = metrics_dir
+    want_tracing = _state.enabled and _state.trace_memory
+    if want_tracing and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not want_tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def metrics_paths() -> dict[str, Path]:
+    return {
+        "jsonl": _state.metrics_dir / JSONL_NAME,
+        "prometheus": _state.metrics_dir / PROM_NAME_TEMPLATE.format(pid=os.getpid()),
+    }
+
+
+def reset() -> None:
+    """Clear the recent calls behind ``summary_frame``; exported counters keep accumulating."""
+    with _state.lock:
+        _state.recent.clear()
+
+
+def _memory_stack() -> list[int]:
+    stack = getattr(_state.local, "memory_stack", None)
+    if stack is None:
+        stack = _state.local.memory_stack = []
+    return stack
+
+
+@contextmanager
+def span(name: str, rows: int | None = None) -> Iterator[dict[str, Any]]:
+    """Time a block; the caller may set ``rows``, ``bytes_read`` or ``bytes_written`` on the yielded record."""
+    if not _state.enabled:
+        yield {}
+        return
+
+    record: dict[str, Any] = {"name": name, "rows": rows, "bytes_read": None, "bytes_written": None}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        _state.trace_lock.acquire()
+        # Nested spans share one tracemalloc peak; each span restores its parent's running peak on exit.
+        current, peak = tracemalloc.get_traced_memory()
+        stack = _memory_stack()
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        stack.append(0)
+        tracemalloc.reset_peak()
+        baseline = current
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["duration_s"] = time.perf_counter() - started
+        record["peak_memory_bytes"] = None
+        if tracing:
+            stack = _memory_stack()
+            own_peak = stack.pop()
+            # Tracing may have been switched off while the span ran.
+            if tracemalloc.is_tracing():
+                own_peak = max(own_peak, tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1] = max(stack[-1], own_peak)
+                record["peak_memory_bytes"] = max(own_peak - baseline, 0)
+            _state.trace_lock.release()
+        _record(record)
+
+
+def timed(
+    name: str | None = None,
+    *,
+    rows: Callable[..., int | None] | None = None,
+    bytes_read: Callable[..., int | None] | None = None,
+    bytes_written: Callable[..., int | None] | None = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate a function with ``span``; extractors are called as ``extractor(result, *args, **kwargs)``.
+
+    Without a ``rows`` extractor, rows are taken from a returned DataFrame or the first DataFrame argument.
+    When instrumentation is disabled the wrapper costs one attribute check.
+    """
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            with span(label) as record:
+                result = fn(*args, **kwargs)
+                record["rows"] = rows(result, *args, **kwargs) if rows else _default_rows(result, args)
+                if bytes_read:
+                    record["bytes_read"] = bytes_read(result, *args, **kwargs)
+                if bytes_written:
+                    record["bytes_written"] = bytes_written(result, *args, **kwargs)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def file_size(path: Path) -> int | None:
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return None
+
+
+def _default_rows(result: Any, args: tuple[Any, ...]) -> int | None:
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    for arg in args:
+        if isinstance(arg, pd.DataFrame):
+            return len(arg)
+    return None
+
+
+def _record(record: dict[str, Any]) -> None:
+    record["timestamp"] = datetime.now().isoformat(timespec="milliseconds")
+    record["pid"] = os.getpid()
+    with _state.lock:
+        _state.recent.append(record)
+        totals = _state.totals.setdefault(
+            record["name"],
+            {
+                "calls": 0,
+                "duration_s_sum": 0.0,
+                "duration_s_max": 0.0,
+                "rows_sum": 0,
+                "bytes_read_sum": 0,
+                "bytes_written_sum": 0,
+                "peak_memory_bytes_max": 0,
+            },
+        )
+        totals["calls"] += 1
+        totals["duration_s_sum"] += record["duration_s"]
+        totals["duration_s_max"] = max(totals["duration_s_max"], record["duration_s"])
+        totals["rows_sum"] += record["rows"] or 0
+        totals["bytes_read_sum"] += record["bytes_read"] or 0
+        totals["bytes_written_sum"] += record["bytes_written"] or 0
+        totals["peak_memory_bytes_max"] = max(totals["peak_memory_bytes_max"], record["peak_memory_bytes"] or 0)
+        _state.pending.append(record)
+        due = (
+            len(_state.pending) >= FLUSH_MAX_PENDING
+            or time.monotonic() - _state.last_flush >= FLUSH_INTERVAL_S
+        )
+    if due:
+        flush()
+
+
+def flush() -> None:
+    """Write buffered records to the JSON-lines log and rewrite this process's Prometheus textfile."""
+    with _state.lock:
+        batch, _state.pending = _state.pending, []
+        _state.last_flush = time.monotonic()
+    if not batch:
+        return
+    # Disk I/O happens outside the recording lock so other sessions keep recording meanwhile.
+    with _state.io_lock:
+        with _state.lock:
+            prom_text = _prometheus_text(_state.totals)
+        paths = metrics_paths()
+        try:
+            _state.metrics_dir.mkdir(parents=True, exist_ok=True)
+            with paths["jsonl"].open("a", encoding="utf-8") as handle:
+                handle.write("".join(json.dumps(record) + "\n" for record in batch))
+            tmp = paths["prometheus"].with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+            tmp.write_text(prom_text, encoding="utf-8")
+            tmp.replace(paths["prometheus"])
+        except OSError:
+            # Metrics export must never break the instrumented call.
+            pass
+
+
+def _shutdown() -> None:
+    flush()
+    # A dead process's counters must not be exported forever by the textfile collector.
+    with _state.io_lock:
+        metrics_paths()["prometheus"].unlink(missing_ok=True)
+
+
+atexit.register(_shutdown)
+
+
+def _prometheus_text(totals: dict[str, dict[str, float]]) -> str:
+    metrics = [
+        ("avs_call_duration_seconds_sum", "counter", "duration_s_sum", "Total wall time spent in the call."),
+        ("avs_call_duration_seconds_count", "counter", "calls", "Number of instrumented calls."),
+        ("avs_call_duration_seconds_max", "gauge", "duration_s_max", "Slowest single call."),
+        ("avs_rows_processed_total", "counter", "rows_sum", "Registry rows processed."),
+        ("avs_bytes_read_total", "counter", "bytes_read_sum", "Bytes read from disk."),
+        ("avs_bytes_written_total", "counter", "bytes_written_sum", "Bytes written to disk."),
+        ("avs_peak_memory_bytes", "gauge", "peak_memory_bytes_max", "Largest traced allocation peak in a call."),
+    ]
+    pid = os.getpid()
+    lines: list[str] = []
+    for metric, kind, key, help_text in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in sorted(totals.items()):
+            lines.append(f'{metric}{{function="{name}",pid="{pid}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def summary_frame() -> pd.DataFrame:
+    """Per-function aggregates of the calls recorded in this process, slowest first."""
+    with _state.lock:
+        recent = list(_state.recent)
+    columns = ["function", "calls", "mean_ms", "p95_ms", "max_ms", "rows", "bytes_read", "bytes_written", "peak_mem_mb"]
+    if not recent:
+        return pd.DataFrame(columns=columns)
+    calls = pd.DataFrame(recent)
+    calls["duration_ms"] = 1000.0 * calls["duration_s"]
+    grouped = calls.groupby("name")
+    out = pd.DataFrame(
+        {
+            "calls": grouped.size(),
+            "mean_ms": grouped["duration_ms"].mean().round(2),
+            "p95_ms": grouped["duration_ms"].quantile(0.95).round(2),
+            "max_ms": grouped["duration_ms"].max().round(2),
+            "rows": grouped["rows"].sum(min_count=1),
+            "bytes_read": grouped["bytes_read"].sum(min_count=1),
+            "bytes_written": grouped["bytes_written"].sum(min_count=1),
+            "peak_mem_mb": (grouped["peak_memory_bytes"].max() / 2**20).round(2),
+        }
+    )
+    return out.rename_axis("function").reset_index().sort_values("mean_ms", ascending=False)[columns]
@@ -0,0 +1,280 @@
+"""Persisted inverted index over AVS free-text fields for ranked record search.
+
+Documents are registry rows, identified by their position in the CSV (appends never renumber rows).
+The index is a base segment of array postings in ``.index.npz`` plus a JSON-lines delta log of rows
+appended since the base was written; the delta is folded into a new base once it exceeds
+``DELTA_COMPACT_ROWS``. Loaded indexes are cached in-process by registry signature.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import uuid
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from registry_cube import registry_signature
+
+
+INDEXED_FIELDS = ["notes", "operator_name", "referring_service"]
+TOKEN_PATTERN = r"[a-z0-9]+"
+DELTA_COMPACT_ROWS = 10000
+
+# BM25 ranking parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_LOADED: dict[str, dict[str, Any]] = {}
+
+
+def index_path_for(data_path: Path) -> Path:
+    return data_path.with_suffix(".index.npz")
+
+
+def delta_path_for(data_path: Path) -> Path:
+    return data_path.with_suffix(".index.delta.jsonl")
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(TOKEN_PATTERN, text.lower())
+
+
+def build_segment(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Index the rows of ``df`` (local doc ids ``0..len(df)-1``) as token-sorted CSR postings."""
+    n_docs = len(df)
+    # Tokenize each distinct field value once; operators, services and templated notes repeat heavily.
+    field_codes = []
+    unique_tokens = []
+    for field in INDEXED_FIELDS:
+        if field not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[field].astype("string").str.lower())
+        tokens = pd.Series(uniques, dtype=object).str.findall(TOKEN_PATTERN).explode().dropna()
+        field_codes.append((codes, len(uniques)))
+        unique_tokens.append(tokens)
+
+    all_tokens = pd.concat(unique_tokens) if unique_tokens else pd.Series([], dtype=object)
+    token_ids, vocab = pd.factorize(all_tokens.to_numpy())
+    order = np.argsort(vocab.astype(str), kind="stable")
+    rank = np.empty(len(vocab), dtype=np.int64)
+    rank[order] = np.arange(len(vocab))
+    vocab = vocab.astype(str)[order]
+
+    keys = []
+    start = 0
+    for (codes, n_uniques), tokens in zip(field_codes, unique_tokens):
+        ids = rank[token_ids[start : start + len(tokens)]]
+        start += len(tokens)
+        per_unique = np.bincount(tokens.index.to_numpy(dtype=np.int64), minlength=n_uniques)
+        offsets = np.concatenate([[0], np.cumsum(per_unique)])
+        docs = np.flatnonzero(codes >= 0)
+        doc_codes = codes[docs]
+        counts = per_unique[doc_codes]
+        total = int(counts.sum())
+        # Expand every document into its value's token run.
+        run_starts = np.repeat(offsets[doc_codes] - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        keys.append(ids[run_starts + np.arange(total)] * max(n_docs, 1) + np.repeat(docs, counts))
+
+    unique_keys, tfs = np.unique(np.concatenate(keys) if keys else np.array([], dtype=np.int64), return_counts=True)
+    token_of = unique_keys // max(n_docs, 1)
+    doc_ids = (unique_keys % max(n_docs, 1)).astype(np.int32)
+    return {
+        "tokens": vocab,
+        "offsets": np.concatenate([[0], np.cumsum(np.bincount(token_of, minlength=len(vocab)))]).astype(np.int64),
+        "doc_ids": doc_ids,
+        "tfs": np.minimum(tfs, np.iinfo(np.uint16).max).astype(np.uint16),
+        "doc_lengths": np.bincount(doc_ids, weights=tfs, minlength=n_docs).astype(np.int32),
+    }
+
+
+def _postings(segment: dict[str, np.ndarray], term: str) -> tuple[np.ndarray, np.ndarray]:
+    tokens = segment["tokens"]
+    pos = int(np.searchsorted(tokens, term))
+    if pos >= len(tokens) or tokens[pos] != term:
+        return segment["doc_ids"][:0], segment["tfs"][:0]
+    lo, hi = segment["offsets"][pos], segment["offsets"][pos + 1]
+    return segment["doc_ids"][lo:hi], segment["tfs"][lo:hi]
+
+
+def _assemble(base: dict[str, np.ndarray], delta_rows: list[list[Any]], signature: list[int] | None) -> dict[str, Any]:
+    delta = build_segment(pd.DataFrame(delta_rows, columns=INDEXED_FIELDS))
+    return {
+        "signature": signature,
+        "base": base,
+        "delta": delta,
+        "delta_rows": delta_rows,
+        "doc_lengths": np.concatenate([base["doc_lengths"], delta["doc_lengths"]]),
+    }
+
+
+def build_index(df: pd.DataFrame, signature: list[int] | None = None) -> dict[str, Any]:
+    return _assemble(build_segment(df), [], signature)
+
+
+def _write_base(index_path: Path, segment: dict[str, np.ndarray], signature: list[int]) -> None:
+    # Unique temp name: several app sessions may rebuild the sidecar at the same time.
+    tmp = index_path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+    with tmp.open("wb") as handle:
+        np.savez(
+            handle,
+            fields=np.array(INDEXED_FIELDS),
+            signature=np.array(signature, dtype=np.int64),
+            **segment,
+        )
+    tmp.replace(index_path)
+
+
+def _read_base(index_path: Path) -> tuple[dict[str, np.ndarray], list[int]] | None:
+    try:
+        with np.load(index_path, allow_pickle=False) as payload:
+            if payload["fields"].tolist() != INDEXED_FIELDS:
+                return None
+            segment = {key: payload[key] for key in ("tokens", "offsets", "doc_ids", "tfs", "doc_lengths")}
+            return segment, payload["signature"].tolist()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _file_stamp(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _load_persisted(data_path: Path, signature: list[int], previous: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Replay the delta log onto the stored base up to ``signature``; ``None`` if the sidecars are stale."""
+    index_path = index_path_for(data_path)
+    base_stamp = _file_stamp(index_path)
+    if base_stamp is None:
+        return None
+    if previous is not None and previous.get("base_stamp") == base_stamp:
+        base, current = previous["base"], previous["signature"]
+        delta_rows, offset = list(previous["delta_rows"]), previous["delta_offset"]
+    else:
+        stored = _read_base(index_path)
+        if stored is None:
+            return None
+        base, current = stored
+        delta_rows, offset = [], 0
+
+    n_docs = len(base["doc_lengths"]) + len(delta_rows)
+    try:
+        with delta_path_for(data_path).open("rb") as handle:
+            handle.seek(offset)
+            # Only complete lines are replayed; a concurrent append may still be writing the last one.
+            for line in handle:
+                if current == signature or not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                entry = json.loads(line)
+                if entry["previous_signature"] != current:
+                    continue
+                if entry["first_row"] != n_docs:
+                    return None
+                delta_rows.extend(entry["rows"])
+                n_docs += len(entry["rows"])
+                current = entry["signature"]
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError):
+        return None
+    if current != signature:
+        return None
+
+    index = _assemble(base, delta_rows, signature)
+    index["base_stamp"] = base_stamp
+    index["delta_offset"] = offset
+    return index
+
+
+def load_or_build_index(data_path: Path, df: pd.DataFrame, signature: list[int] | None) -> dict[str, Any]:
+    """Return the search index for registry version ``signature``, rebuilding it only when stale.
+
+    ``signature`` must be captured before ``df`` was loaded; a rebuilt index is only persisted if the
+    registry is still at that version.
+    """
+    key = str(data_path.resolve())
+    previous = _LOADED.get(key)
+    if signature is not None and previous is not None and previous["signature"] == signature:
+        return previous
+
+    index = _load_persisted(data_path, signature, previous) if signature is not None else None
+    if index is None or len(index["delta_rows"]) > DELTA_COMPACT_ROWS:
+        index = build_index(df, signature)
+        if signature is None or registry_signature(data_path) != signature:
+            return index
+        _write_base(index_path_for(data_path), index["base"], signature)
+        delta_path_for(data_path).unlink(missing_ok=True)
+        index["base_stamp"] = _file_stamp(index_path_for(data_path))
+        index["delta_offset"] = 0
+    _LOADED[key] = index
+    return index
+
+
+def update_index_on_append(
+    data_path: Path, new_rows: pd.DataFrame, previous_signature: list[int] | None, first_row: int
+) -> None:
+    """Log freshly appended rows (registry positions from ``first_row``) to the delta; cost is O(new rows).
+
+    Entries are chained by registry signature, so a missed or out-of-order append only makes the
+    index stale (and rebuilt on the next load) rather than wrong.
+    """
+    if previous_signature is None or not index_path_for(data_path).exists():
+        return
+    rows = new_rows.reindex(columns=INDEXED_FIELDS).astype(object)
+    rows = rows.where(rows.notna(), None)
+    entry = {
+        "previous_signature": previous_signature,
+        "signature": registry_signature(data_path),
+        "first_row": first_row,
+        "rows": rows.values.tolist(),
+    }
+    with delta_path_for(data_path).open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(entry, default=str) + "\n")
+
+
+def search_index(index: dict[str, Any], query: str, limit: int = 50) -> tuple[list[tuple[int, float]], int]:
+    """Rank registry rows against ``query`` with BM25.
+
+    Returns up to ``limit`` ``(row_position, score)`` pairs, best first, and the total number of matching rows.
+    """
+    doc_lengths = index["doc_lengths"]
+    n_docs = len(doc_lengths)
+    terms = sorted(set(tokenize(query)))
+    if not n_docs or not terms:
+        return [], 0
+
+    avg_length = float(doc_lengths.mean()) or 1.0
+    n_base = len(index["base"]["doc_lengths"])
+    matched_docs = []
+    contributions = []
+    for term in terms:
+        base_docs, base_tfs = _postings(index["base"], term)
+        delta_docs, delta_tfs = _postings(index["delta"], term)
+        docs = np.concatenate([base_docs.astype(np.int64), delta_docs.astype(np.int64) + n_base])
+        if not len(docs):
+            continue
+        tf = np.concatenate([base_tfs, delta_tfs]).astype(np.float64)
+        idf = math.log(1.0 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_lengths[docs] / avg_length)
+        matched_docs.append(docs)
+        contributions.append(idf * tf * (BM25_K1 + 1.0) / (tf + norm))
+    if not matched_docs:
+        return [], 0
+
+    # Every BM25 contribution is positive, so matching rows are exactly the rows with a non-zero score.
+    scores = np.bincount(np.concatenate(matched_docs), weights=np.concatenate(contributions), minlength=n_docs)
+    if limit < n_docs:
+        candidates = np.argpartition(-scores, limit - 1)[:limit]
+    else:
+        candidates = np.arange(n_docs)
+    candidates = candidates[scores[candidates] > 0]
+    # Best score first; ties keep registry order.
+    ranked = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return [(int(doc), float(scores[doc])) for doc in ranked], int(np.count_nonzero(scores))
@@ -0,0 +1,198 @@
+"""Pre-aggregated AVS count cube for stratified dashboard drill-down."""
+from __future__ import annotations
+
+import json
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+
+CUBE_DIMENSIONS = [
+    "month",
+    "operator_name",
+    "final_interpretation",
+    "management_plan",
+    "sex",
+    "cosyntropin_used",
+]
+
+# Additive measures only, so cells can be summed across any slice of the cube.
+CUBE_MEASURES = [
+    "cases",
+    "age_n",
+    "age_sum",
+    "selectivity_known",
+    "bilateral_selective",
+    "complication_yes",
+    "bp_improved_known",
+    "bp_improved_yes",
+    "k_normalized_known",
+    "k_normalized_yes",
+]
+
+CUBE_RATES = {
+    "mean_age_years": ("age_sum", "age_n"),
+    # Every case is the denominator, matching the Dashboard metric, summary_table and the bootstrap CIs.
+    "bilateral_selective_percent": ("bilateral_selective", "cases"),
+    "complication_percent": ("complication_yes", "cases"),
+    "bp_improved_percent": ("bp_improved_yes", "bp_improved_known"),
+    "k_normalized_percent": ("k_normalized_yes", "k_normalized_known"),
+}
+
+MISSING_LABEL = "Unknown"
+
+
+def cube_path_for(data_path: Path) -> Path:
+    return data_path.with_suffix(".cube.json")
+
+
+def registry_signature(data_path: Path) -> list[int] | None:
+    if not data_path.exists():
+        return None
+    stat = data_path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def empty_cube() -> pd.DataFrame:
+    cube = pd.DataFrame(columns=CUBE_DIMENSIONS + CUBE_MEASURES)
+    return cube.astype({col: "int64" for col in CUBE_MEASURES} | {"age_sum": "float64"})
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate a typed registry frame (see ``typed_frame``) into cube cells."""
+    if df.empty:
+        return empty_cube()
+
+    keys = pd.DataFrame(index=df.index)
+    for col in CUBE_DIMENSIONS:
+        values = df[col].astype("string").str.strip()
+        keys[col] = values.mask(values.isna() | (values == "") | (values == "NaT"), MISSING_LABEL)
+
+    age = pd.to_numeric(df["age_years"], errors="coerce")
+    si_right = pd.to_numeric(df["selectivity_index_right"], errors="coerce")
+    si_left = pd.to_numeric(df["selectivity_index_left"], errors="coerce")
+    bp = df["bp_improved_3m"].astype("string")
+    k = df["k_normalized_3m"].astype("string")
+
+    measures = pd.DataFrame(
+        {
+            "cases": 1,
+            "age_n": age.notna().astype("int64"),
+            "age_sum": age.fillna(0.0),
+            "selectivity_known": (si_right.notna() & si_left.notna()).astype("int64"),
+            "bilateral_selective": ((si_right >= 2.0) & (si_left >= 2.0)).astype("int64"),
+            "complication_yes": (df["complication"].astype("string") == "Yes").fillna(False).astype("int64"),
+            "bp_improved_known": bp.isin(["Yes", "No"]).fillna(False).astype("int64"),
+            "bp_improved_yes": (bp == "Yes").fillna(False).astype("int64"),
+            "k_normalized_known": k.isin(["Yes", "No"]).fillna(False).astype("int64"),
+            "k_normalized_yes": (k == "Yes").fillna(False).astype("int64"),
+        },
+        index=df.index,
+    )
+    frame = pd.concat([keys.astype(str), measures], axis=1)
+    return frame.groupby(CUBE_DIMENSIONS, sort=True).sum().reset_index()
+
+
+def merge_cubes(*cubes: pd.DataFrame) -> pd.DataFrame:
+    parts = [cube for cube in cubes if not cube.empty]
+    if not parts:
+        return empty_cube()
+    combined = pd.concat(parts, ignore_index=True)
+    return combined.groupby(CUBE_DIMENSIONS, sort=True)[CUBE_MEASURES].sum().reset_index()
+
+
+def _write_cube(cube_path: Path, cube: pd.DataFrame, signature: list[int] | None) -> None:
+    payload = {
+        "registry_signature": signature,
+        "dimensions": CUBE_DIMENSIONS,
+        "measures": CUBE_MEASURES,
+        "cells": cube[CUBE_DIMENSIONS + CUBE_MEASURES].to_dict(orient="records"),
+    }
+    # Unique temp name: several app sessions may rebuild the sidecar at the same time.
+    tmp = cube_path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    tmp.replace(cube_path)
+
+
+def _read_cube(cube_path: Path) -> tuple[pd.DataFrame, list[int] | None] | None:
+    if not cube_path.exists():
+        return None
+    try:
+        payload = json.loads(cube_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if payload.get("dimensions") != CUBE_DIMENSIONS or payload.get("measures") != CUBE_MEASURES:
+        return None
+    cells = payload.get("cells") or []
+    cube = pd.DataFrame(cells, columns=CUBE_DIMENSIONS + CUBE_MEASURES) if cells else empty_cube()
+    return cube, payload.get("registry_signature")
+
+
+def load_or_build_cube(data_path: Path, typed_df: pd.DataFrame, signature: list[int] | None) -> pd.DataFrame:
+    """Return the cube for registry version ``signature``, rebuilding it only when stale.
+
+    ``signature`` must be captured before ``typed_df`` was loaded. A rebuilt cube is only saved
+    if the registry is still at that version, so a concurrent append cannot be labelled as covered.
+    """
+    cube_path = cube_path_for(data_path)
+    cached = _read_cube(cube_path)
+    if cached is not None and signature is not None and cached[1] == signature:
+        return cached[0]
+
+    cube = build_cube(typed_df)
+    if signature is not None and registry_signature(data_path) == signature:
+        _write_cube(cube_path, cube, signature)
+    return cube
+
+
+def update_cube_on_append(data_path: Path, new_rows: pd.DataFrame, previous_signature: list[int] | None) -> None:
+    """Fold freshly appended typed rows into the stored cube without rescanning the registry.
+
+    The stored cube is only updated when it matches the registry version that existed before
+    the append; otherwise it is left stale and rebuilt on the next load.
+    """
+    cube_path = cube_path_for(data_path)
+    cached = _read_cube(cube_path)
+    if cached is None or previous_signature is None or cached[1] != previous_signature:
+        return
+    _write_cube(cube_path, merge_cubes(cached[0], build_cube(new_rows)), registry_signature(data_path))
+
+
+def slice_cube(cube: pd.DataFrame, filters: dict[str, list[str]]) -> pd.DataFrame:
+    mask = pd.Series(True, index=cube.index)
+    for col, allowed in filters.items():
+        if allowed:
+            mask &= cube[col].isin(allowed)
+    return cube[mask]
+
+
+def _rate_scale(rate: str) -> float:
+    return 1.0 if rate == "mean_age_years" else 100.0
+
+
+def add_rates(agg: pd.DataFrame) -> pd.DataFrame:
+    out = agg.copy()
+    for rate, (numerator, denominator) in CUBE_RATES.items():
+        denom = out[denominator].where(out[denominator] > 0)
+        out[rate] = (_rate_scale(rate) * out[numerator] / denom).round(1)
+    return out
+
+
+def rollup(cube: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+    if not by:
+        totals = cube[CUBE_MEASURES].sum().to_frame().T
+        return add_rates(totals)
+    return add_rates(cube.groupby(by, sort=True)[CUBE_MEASURES].sum().reset_index())
+
+
+def pivot_cube(cube: pd.DataFrame, index: str, columns: str, value: str) -> pd.DataFrame:
+    """Pivot a measure or derived rate across two cube dimensions."""
+    if cube.empty:
+        return pd.DataFrame()
+    if value in CUBE_MEASURES:
+        return cube.pivot_table(index=index, columns=columns, values=value, aggfunc="sum", fill_value=0)
+    numerator, denominator = CUBE_RATES[value]
+    num = cube.pivot_table(index=index, columns=columns, values=numerator, aggfunc="sum", fill_value=0)
+    den = cube.pivot_table(index=index, columns=columns, values=denominator, aggfunc="sum", fill_value=0)
+    return (_rate_scale(value) * num / den.where(den > 0)).round(1)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Run whole-registry AVS data-quality checks and write findings as a timestamped report run."""
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+FINDING_COLUMNS = [
+    "check",
+    "severity",
+    "record_id",
+    "patient_code",
+    "procedure_date",
+    "field",
+    "value",
+    "message",
+]
+
+# Plausible sampling-site ranges; adrenal-vein aldosterone can be very high after cosyntropin.
+HORMONE_LIMITS = {
+    "aldosterone_ng_dl_ivc": (0.0, 20000.0),
+    "aldosterone_ng_dl_right": (0.0, 20000.0),
+    "aldosterone_ng_dl_left": (0.0, 20000.0),
+    "cortisol_ug_dl_ivc": (0.0, 3000.0),
+    "cortisol_ug_dl_right": (0.0, 3000.0),
+    "cortisol_ug_dl_left": (0.0, 3000.0),
+}
+
+# 3-month outcomes are considered overdue this many days after the procedure.
+OUTCOME_DUE_DAYS = 90 + 30
+OUTCOME_FIELDS = ["bp_improved_3m", "k_normalized_3m"]
+
+LI_UNILATERAL_THRESHOLD = 4.0
+LI_BILATERAL_THRESHOLD = 3.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run AVS registry data-quality audit")
+    parser.add_argument(
+        "--input",
+        type=Path,
+        default=Path("projects/avs_registry/data/avs/avs_registry.csv"),
+        help="Path to AVS registry CSV",
+    )
+    parser.add_argument(
+        "--outdir",
+        type=Path,
+        default=Path("projects/avs_registry/reporting/outputs"),
+        help="Output directory root for audit artifacts",
+    )
+    parser.add_argument(
+        "--as-of",
+        type=date.fromisoformat,
+        default=None,
+        help="Reference date (YYYY-MM-DD) for overdue follow-up checks; defaults to today",
+    )
+    return parser.parse_args()
+
+
+def _numeric(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[col], errors="coerce")
+
+
+def _text(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[col].fillna("").astype(str).str.strip()
+
+
+def _dates(df: pd.DataFrame) -> pd.Series:
+    if "procedure_date" not in df.columns:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    return pd.to_datetime(df["procedure_date"], errors="coerce")
+
+
+def _findings(
+    df: pd.DataFrame,
+    mask: pd.Series,
+    check: str,
+    severity: str,
+    field: str,
+    value: pd.Series,
+    message: pd.Series | str,
+) -> pd.DataFrame:
+    mask = mask.fillna(False).astype(bool)
+    if not mask.any():
+        return pd.DataFrame(columns=FINDING_COLUMNS)
+    hits = df.loc[mask]
+    return pd.DataFrame(
+        {
+            "check": check,
+            "severity": severity,
+            "record_id": _text(hits, "record_id"),
+            "patient_code": _text(hits, "patient_code"),
+            "procedure_date": _dates(hits).dt.strftime("%Y-%m-%d").fillna(""),
+            "field": field,
+            "value": value[mask].astype(str),
+            "message": message[mask] if isinstance(message, pd.Series) else message,
+        },
+        index=hits.index,
+    )
+
+
+def check_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    dates = _dates(df).dt.strftime("%Y-%m-%d")
+    keys = pd.DataFrame({"patient_code": _text(df, "patient_code").str.upper(), "procedure_date": dates.fillna("")})
+    hashed = pd.util.hash_pandas_object(keys, index=False)
+    mask = hashed.duplicated(keep=False) & (keys["patient_code"] != "")
+    copies = hashed.map(hashed[mask].value_counts()).fillna(0).astype(int)
+    value = keys["patient_code"] + " @ " + keys["procedure_date"]
+    message = "Same patient_code and procedure_date appear in " + copies.astype(str) + " records."
+    return _findings(df, mask, "duplicate_case", "error", "patient_code+procedure_date", value, message)
+
+
+def check_hormone_values(df: pd.DataFrame) -> pd.DataFrame:
+    parts = []
+    for col, (low, high) in HORMONE_LIMITS.items():
+        if col not in df.columns:
+            continue
+        raw = df[col]
+        values = pd.to_numeric(raw, errors="coerce")
+        non_numeric = values.isna() & raw.notna()
+        if non_numeric.any():
+            non_numeric[non_numeric] = raw[non_numeric].astype(str).str.strip() != ""
+        parts.append(
+            _findings(df, non_numeric, "implausible_hormone", "error", col, raw, "Value is not numeric.")
+        )
+        out_of_range = (values < low) | (values > high)
+        message = f"Outside plausible range {low:g}-{high:g}."
+        if col.startswith("cortisol"):
+            # Cortisol is the selectivity/lateralization denominator, so zero is unusable.
+            out_of_range |= values == 0
+            message = f"Outside plausible range {low:g}-{high:g} (cortisol must be > 0)."
+        parts.append(_findings(df, out_of_range, "implausible_hormone", "warning", col, values, message))
+    return pd.concat(parts) if parts else pd.DataFrame(columns=FINDING_COLUMNS)
+
+
+def check_overdue_outcomes(df: pd.DataFrame, as_of: date) -> pd.DataFrame:
+    due = _dates(df) + pd.Timedelta(days=OUTCOME_DUE_DAYS)
+    overdue = due < pd.Timestamp(as_of)
+    parts = []
+    for col in OUTCOME_FIELDS:
+        recorded = _text(df, col).isin(["Yes", "No"])
+        message = "3-month outcome still missing; due " + due.dt.strftime("%Y-%m-%d").fillna("") + "."
+        parts.append(_findings(df, overdue & ~recorded, "overdue_outcome", "warning", col, _text(df, col), message))
+    return pd.concat(parts)
+
+
+def check_interpretation_consistency(df: pd.DataFrame) -> pd.DataFrame:
+    interpretation = _text(df, "final_interpretation")
+    li = _numeric(df, "lateralization_index")
+    unilateral = interpretation.str.startswith("Unilateral")
+    bilateral = interpretation == "Bilateral hypersecretion"
+
+    ratio_right = _numeric(df, "aldosterone_ng_dl_right") / _numeric(df, "cortisol_ug_dl_right")
+    ratio_left = _numeric(df, "aldosterone_ng_dl_left") / _numeric(df, "cortisol_ug_dl_left")
+    dominant = pd.Series(
+        np.select([ratio_right > ratio_left, ratio_left > ratio_right], ["right", "left"], default=""),
+        index=df.index,
+    )
+    called_side = interpretation.str.removeprefix("Unilateral ").str.lower()
+
+    return pd.concat(
+        [
+            _findings(
+                df,
+                unilateral & li.isna(),
+                "interpretation_vs_li",
+                "warning",
+                "lateralization_index",
+                li,
+                "Unilateral interpretation without a lateralization index.",
+            ),
+            _findings(
+                df,
+                unilateral & (li < LI_BILATERAL_THRESHOLD),
+                "interpretation_vs_li",
+                "error",
+                "lateralization_index",
+                li,
+                f"Unilateral interpretation with LI < {LI_BILATERAL_THRESHOLD:g}.",
+            ),
+            _findings(
+                df,
+                bilateral & (li >= LI_UNILATERAL_THRESHOLD),
+                "interpretation_vs_li",
+                "error",
+                "lateralization_index",
+                li,
+                f"Bilateral interpretation with LI >= {LI_UNILATERAL_THRESHOLD:g}.",
+            ),
+            _findings(
+                df,
+                unilateral & (dominant != "") & (called_side != dominant),
+                "interpretation_vs_li",
+                "error",
+                "final_interpretation",
+                interpretation,
+                "Lateralized side disagrees with the higher aldosterone/cortisol ratio (" + dominant + ").",
+            ),
+        ]
+    )
+
+
+def audit_registry(df: pd.DataFrame, as_of: date | None = None) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=FINDING_COLUMNS)
+    as_of = as_of or date.today()
+    findings = pd.concat(
+        [
+            check_duplicates(df),
+            check_hormone_values(df),
+            check_overdue_outcomes(df, as_of),
+            check_interpretation_consistency(df),
+        ]
+    )
+    findings = findings[FINDING_COLUMNS]
+    return findings.sort_index(kind="stable").reset_index(drop=True)
+
+
+def audit_summary(findings: pd.DataFrame) -> pd.DataFrame:
+    if findings.empty:
+        return pd.DataFrame(columns=["check", "severity", "findings", "records"])
+    return (
+        findings.groupby(["check", "severity"])
+        .agg(findings=("record_id", "size"), records=("record_id", "nunique"))
+        .reset_index()
+    )
+
+
+def generate_audit_report(input_csv: Path, outdir_root: Path, as_of: date | None = None) -> dict[str, Path]:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    in_path = input_csv.expanduser().resolve()
+    if not in_path.exists():
+        raise FileNotFoundError(f"Input CSV not found: {in_path}")
+    outdir = outdir_root.expanduser().resolve() / f"avs_audit_{timestamp}"
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    findings = audit_registry(pd.read_csv(in_path), as_of=as_of)
+
+    findings_csv = outdir / "01_audit_findings.csv"
+    summary_csv = outdir / "02_audit_summary.csv"
+    findings.to_csv(findings_csv, index=False)
+    audit_summary(findings).to_csv(summary_csv, index=False)
+
+    return {
+        "run_dir": outdir,
+        "findings_csv": findings_csv,
+        "summary_csv": summary_csv,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    artifacts = generate_audit_report(input_csv=args.input, outdir_root=args.outdir, as_of=args.as_of)
+
+    print("Generated audit artifacts:")
+    print(f"- {artifacts['findings_csv']}")
+    print(f"- {artifacts['summary_csv']}")
+
+
+if __name__ == "__main__":
+    main()
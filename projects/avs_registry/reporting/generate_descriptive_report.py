@@ -6,9 +6,27 @@ import argparse
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 
+SUMMARY_METRICS = [
+    "total_cases",
+    "median_age_years",
+    "female_percent",
+    "bilateral_selective_percent",
+    "complication_percent",
+]
+
+BOOTSTRAP_SEED = 20240601
+# Upper bound on resample-index cells held in memory at once (resamples x rows).
+BOOTSTRAP_MAX_CELLS = 2**24
+# Factors are packed into joint mixed-radix codes of at most this many levels, so one
+# gather + bincount per chunk yields the counts for several statistics at once.
+BOOTSTRAP_MAX_JOINT_LEVELS = 2**16
+CI_COLUMNS = ["ci95_lower", "ci95_upper"]
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate AVS descriptive report artifacts")
     parser.add_argument(
@@ -23,6 +41,18 @@ def parse_args() -> argparse.Namespace:
         default=Path("projects/avs_registry/reporting/outputs"),
         help="Output directory root for report artifacts",
     )
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=0,
+        help="Number of bootstrap resamples for 95%% CIs (0 disables CIs)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=BOOTSTRAP_SEED,
+        help="Random seed for bootstrap resampling",
+    )
     return parser.parse_args()
 
 
@@ -52,52 +82,220 @@ def load_and_type(csv_path: Path) -> pd.DataFrame:
     return df
 
 
-def summary_table(df: pd.DataFrame) -> pd.DataFrame:
+def _female_flag(df: pd.DataFrame) -> pd.Series:
+    return df["sex"].astype(str).str.lower() == "female"
+
+
+def _complication_flag(df: pd.DataFrame) -> pd.Series:
+    return df["complication"].astype(str) == "Yes"
+
+
+def _bootstrap_index_chunks(n_rows: int, n_resamples: int, seed: int, min_width: int):
+    rng = np.random.default_rng(seed)
+    per_chunk = max(1, BOOTSTRAP_MAX_CELLS // max(n_rows, min_width))
+    remaining = n_resamples
+    while remaining > 0:
+        size = min(per_chunk, remaining)
+        yield rng.integers(0, n_rows, size=(size, n_rows))
+        remaining -= size
+
+
+def _pack_factors(factors: dict[str, tuple[np.ndarray, int]]) -> list[tuple[list[str], list[int], np.ndarray]]:
+    groups: list[tuple[list[str], list[int], np.ndarray]] = []
+    for name, (codes, n_levels) in factors.items():
+        if groups and int(np.prod(groups[-1][1])) * n_levels <= BOOTSTRAP_MAX_JOINT_LEVELS:
+            names, sizes, joint = groups[-1]
+            groups[-1] = (names + [name], sizes + [n_levels], joint * n_levels + codes)
+        else:
+            groups.append(([name], [n_levels], codes.astype(np.int64)))
+    return groups
+
+
+def _resampled_counts(codes: np.ndarray, n_levels: int, idx: np.ndarray) -> np.ndarray:
+    """Count each level of integer-coded rows in every resample: shape (resamples, levels)."""
+    offsets = (np.arange(idx.shape[0]) * n_levels)[:, None]
+    flat = np.bincount((codes[idx] + offsets).ravel(), minlength=idx.shape[0] * n_levels)
+    return flat.reshape(idx.shape[0], n_levels)
+
+
+def _median_from_counts(levels: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    totals = counts.sum(axis=1)
+    if len(levels) == 0:
+        return np.full(len(totals), np.nan)
+    cum = counts.cumsum(axis=1)
+    last = len(levels) - 1
+    lower = levels[np.minimum((cum < ((totals + 1) // 2)[:, None]).sum(axis=1), last)]
+    upper = levels[np.minimum((cum < (totals // 2 + 1)[:, None]).sum(axis=1), last)]
+    return np.where(totals > 0, (lower + upper) / 2.0, np.nan)
+
+
+def _encode(values: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Factorize values with missing entries coded as an extra trailing level."""
+    codes, levels = pd.factorize(values, sort=True)
+    codes = np.where(codes < 0, len(levels), codes)
+    return codes, pd.Index(levels)
+
+
+def _percentile_interval(stats: np.ndarray) -> np.ndarray:
+    with np.errstate(all="ignore"):
+        valid = ~np.isnan(stats)
+        if stats.ndim == 1:
+            if not valid.any():
+                return np.array([np.nan, np.nan])
+            return np.round(np.percentile(stats[valid], [2.5, 97.5]), 1)
+        bounds = np.full((2, stats.shape[1]), np.nan)
+        has_any = valid.any(axis=0)
+        if has_any.any():
+            bounds[:, has_any] = np.nanpercentile(stats[:, has_any], [2.5, 97.5], axis=0)
+        return np.round(bounds, 1)
+
+
+def bootstrap_intervals(df: pd.DataFrame, n_resamples: int, seed: int = BOOTSTRAP_SEED) -> dict[str, pd.DataFrame]:
+    """Percentile bootstrap 95% CIs for summary metrics and per-year/per-category percentages.
+
+    Every statistic is computed from the same resample-index matrix, processed in memory-bounded
+    chunks. Rows are reduced to packed integer codes so per-resample counts for all statistics come
+    from batched ``bincount`` calls rather than a Python loop over resamples.
+    """
+    n_rows = len(df)
+    if df.empty or n_resamples <= 0:
+        return {}
+
+    factors: dict[str, tuple[np.ndarray, int]] = {}
+    if "age_years" in df.columns:
+        ages = pd.to_numeric(df["age_years"], errors="coerce")
+        age_codes, age_levels = _encode(ages)
+        factors["age"] = (age_codes, len(age_levels) + 1)
+    if "sex" in df.columns:
+        factors["female"] = (_female_flag(df).to_numpy(dtype=np.int64), 2)
+    if "bilateral_selective" in df.columns:
+        bilateral = pd.to_numeric(df["bilateral_selective"], errors="coerce")
+        factors["bilateral"] = (np.where(bilateral.isna(), 2, bilateral.fillna(0).astype(int)), 3)
+    if "complication" in df.columns:
+        factors["complication"] = (_complication_flag(df).to_numpy(dtype=np.int64), 2)
+    category_levels: dict[str, pd.Index] = {}
+    for column in ["year", "final_interpretation", "management_plan"]:
+        if column in df.columns:
+            codes, levels = _encode(df[column])
+            factors[column] = (codes, len(levels) + 1)
+            category_levels[column] = levels
+
+    groups = _pack_factors(factors)
+    widest = max(int(np.prod(sizes)) for _, sizes, _ in groups)
+    chunks: dict[str, list[np.ndarray]] = {name: [] for name in factors}
+    for idx in _bootstrap_index_chunks(n_rows, n_resamples, seed, widest):
+        for names, sizes, joint in groups:
+            joint_counts = _resampled_counts(joint, int(np.prod(sizes)), idx).reshape(idx.shape[0], *sizes)
+            for axis, name in enumerate(names, start=1):
+                others = tuple(a for a in range(1, len(sizes) + 1) if a != axis)
+                chunks[name].append(joint_counts.sum(axis=others))
+    counts = {name: np.concatenate(parts) for name, parts in chunks.items()}
+
+    with np.errstate(all="ignore"):
+        summary_stats: dict[str, np.ndarray] = {}
+        if "age" in counts:
+            summary_stats["median_age_years"] = _median_from_counts(
+                age_levels.to_numpy(dtype=float), counts["age"][:, :-1]
+            )
+        if "female" in counts:
+            summary_stats["female_percent"] = 100.0 * counts["female"][:, 1] / n_rows
+        if "bilateral" in counts:
+            summary_stats["bilateral_selective_percent"] = (
+                100.0 * counts["bilateral"][:, 1] / counts["bilateral"][:, :2].sum(axis=1)
+            )
+        if "complication" in counts:
+            summary_stats["complication_percent"] = 100.0 * counts["complication"][:, 1] / n_rows
+
+    summary_rows = [[metric, *_percentile_interval(stats)] for metric, stats in summary_stats.items()]
+    intervals = {"summary": pd.DataFrame(summary_rows, columns=["metric", *CI_COLUMNS])}
+
+    for column, levels in category_levels.items():
+        level_counts = counts[column]
+        if column == "year":
+            # Yearly shares are relative to cases with a valid procedure date.
+            level_counts = level_counts[:, :-1]
+            keys = list(levels)
+        else:
+            keys = [*levels, np.nan]
+        with np.errstate(all="ignore"):
+            shares = 100.0 * level_counts / level_counts.sum(axis=1, keepdims=True)
+        bounds = _percentile_interval(shares)
+        intervals[column] = pd.DataFrame({column: keys, "ci95_lower": bounds[0], "ci95_upper": bounds[1]})
+    return intervals
+
+
+def summary_table(df: pd.DataFrame, intervals: dict[str, pd.DataFrame] | None = None) -> pd.DataFrame:
     if df.empty:
-        return pd.DataFrame(
+        out = pd.DataFrame({"metric": SUMMARY_METRICS, "value": [0, pd.NA, pd.NA, pd.NA, pd.NA]})
+    else:
+        female_pct = pd.NA
+        if "sex" in df.columns and len(df) > 0:
+            female_pct = round(100.0 * _female_flag(df).mean(), 1)
+
+        bilateral_pct = pd.NA
+        if "bilateral_selective" in df.columns:
+            bilateral_pct = round(100.0 * pd.to_numeric(df["bilateral_selective"], errors="coerce").mean(), 1)
+
+        complication_pct = pd.NA
+        if "complication" in df.columns and len(df) > 0:
+            complication_pct = round(100.0 * _complication_flag(df).mean(), 1)
+
+        med_age = pd.NA
+        if "age_years" in df.columns:
+            med_age = round(df["age_years"].median(), 1)
+
+        out = pd.DataFrame(
             {
-                "metric": [
-                    "total_cases",
-                    "median_age_years",
-                    "female_percent",
-                    "bilateral_selective_percent",
-                    "complication_percent",
-                ],
-                "value": [0, pd.NA, pd.NA, pd.NA, pd.NA],
+                "metric": SUMMARY_METRICS,
+                "value": [len(df), med_age, female_pct, bilateral_pct, complication_pct],
             }
         )
 
-    female_pct = pd.NA
-    if "sex" in df.columns and len(df) > 0:
-        female_pct = round(100.0 * (df["sex"].astype(str).str.lower() == "female").mean(), 1)
+    if intervals is None:
+        return out
+    ci = intervals.get("summary", pd.DataFrame(columns=["metric", *CI_COLUMNS]))
+    return out.merge(ci, on="metric", how="left")
 
-    bilateral_pct = pd.NA
-    if "bilateral_selective" in df.columns:
-        bilateral_pct = round(100.0 * pd.to_numeric(df["bilateral_selective"], errors="coerce").mean(), 1)
 
-    complication_pct = pd.NA
-    if "complication" in df.columns and len(df) > 0:
-        complication_pct = round(100.0 * (df["complication"].astype(str) == "Yes").mean(), 1)
+def distribution_table(
+    df: pd.DataFrame, column: str, intervals: dict[str, pd.DataFrame] | None = None
+) -> pd.DataFrame:
+    if df.empty or column not in df.columns:
+        columns = [column, "cases", "percent", *CI_COLUMNS] if intervals is not None else [column, "cases"]
+        return pd.DataFrame(columns=columns)
 
-    med_age = pd.NA
-    if "age_years" in df.columns:
-        med_age = round(df["age_years"].median(), 1)
-
-    return pd.DataFrame(
-        {
-            "metric": [
-                "total_cases",
-                "median_age_years",
-                "female_percent",
-                "bilateral_selective_percent",
-                "complication_percent",
-            ],
-            "value": [len(df), med_age, female_pct, bilateral_pct, complication_pct],
+    if column == "year":
+        out = df.groupby("year", dropna=True).size().reset_index(name="cases")
+    else:
+        out = df[column].value_counts(dropna=False).rename_axis(column).reset_index(name="cases")
+
+    if intervals is None:
+        return out
+    out["percent"] = (100.0 * out["cases"] / out["cases"].sum()).round(1)
+    ci = intervals.get(column, pd.DataFrame(columns=[column, *CI_COLUMNS]))
+    return out.merge(ci, on=column, how="left")
+
+
+def _format_ci(row: pd.Series) -> str:
+    if "ci95_lower" not in row.index or pd.isna(row["ci95_lower"]):
+        return ""
+    if "percent" in row.index:
+        return f" ({row['percent']}%; 95% CI {row['ci95_lower']}-{row['ci95_upper']}%)"
+    return f" (95% CI {row['ci95_lower']}-{row['ci95_upper']})"
+
+
+def write_markdown_report(
+    df: pd.DataFrame,
+    summary_df: pd.DataFrame,
+    out_md: Path,
+    distributions: dict[str, pd.DataFrame] | None = None,
+    bootstrap_note: str | None = None,
+) -> None:
+    if distributions is None:
+        distributions = {
+            column: distribution_table(df, column) for column in ["year", "final_interpretation", "management_plan"]
         }
-    )
 
-
-def write_markdown_report(df: pd.DataFrame, summary_df: pd.DataFrame, out_md: Path) -> None:
     lines: list[str] = []
     lines.append("# AVS Descriptive Report")
     lines.append("")
@@ -107,18 +305,21 @@ def write_markdown_report(df: pd.DataFrame, summary_df: pd.DataFrame, out_md: Pa
     lines.append("## Cohort Summary")
     lines.append("")
     for _, row in summary_df.iterrows():
-        lines.append(f"- {row['metric']}: {row['value']}")
+        lines.append(f"- {row['metric']}: {row['value']}{_format_ci(row)}")
+    if bootstrap_note:
+        lines.append("")
+        lines.append(f"_{bootstrap_note}_")
 
     lines.append("")
     lines.append("## Annual Case Volume")
     lines.append("")
     if not df.empty and "year" in df.columns:
-        yearly = df.groupby("year", dropna=True).size().sort_index()
+        yearly = distributions["year"].sort_values("year")
         if yearly.empty:
             lines.append("- No valid procedure dates available.")
         else:
-            for y, n in yearly.items():
-                lines.append(f"- {int(y)}: {int(n)}")
+            for _, row in yearly.iterrows():
+                lines.append(f"- {int(row['year'])}: {int(row['cases'])}{_format_ci(row)}")
     else:
         lines.append("- No data available.")
 
@@ -126,9 +327,8 @@ def write_markdown_report(df: pd.DataFrame, summary_df: pd.DataFrame, out_md: Pa
     lines.append("## Interpretation Distribution")
     lines.append("")
     if not df.empty and "final_interpretation" in df.columns:
-        counts = df["final_interpretation"].value_counts(dropna=False)
-        for k, n in counts.items():
-            lines.append(f"- {k}: {int(n)}")
+        for _, row in distributions["final_interpretation"].iterrows():
+            lines.append(f"- {row['final_interpretation']}: {int(row['cases'])}{_format_ci(row)}")
     else:
         lines.append("- No data available.")
 
@@ -136,24 +336,32 @@ def write_markdown_report(df: pd.DataFrame, summary_df: pd.DataFrame, out_md: Pa
     lines.append("## Management Distribution")
     lines.append("")
     if not df.empty and "management_plan" in df.columns:
-        counts = df["management_plan"].value_counts(dropna=False)
-        for k, n in counts.items():
-            lines.append(f"- {k}: {int(n)}")
+        for _, row in distributions["management_plan"].iterrows():
+            lines.append(f"- {row['management_plan']}: {int(row['cases'])}{_format_ci(row)}")
     else:
         lines.append("- No data available.")
 
     out_md.write_text("\n".join(lines), encoding="utf-8")
 
 
-def generate_descriptive_report(input_csv: Path, outdir_root: Path) -> dict[str, Path]:
+def generate_descriptive_report(
+    input_csv: Path,
+    outdir_root: Path,
+    bootstrap_resamples: int = 0,
+    seed: int = BOOTSTRAP_SEED,
+) -> dict[str, Path]:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
     in_path = input_csv.expanduser().resolve()
     outdir = outdir_root.expanduser().resolve() / f"avs_descriptive_{timestamp}"
     outdir.mkdir(parents=True, exist_ok=True)
 
     df = load_and_type(in_path)
-    summary_df = summary_table(df)
+    intervals = bootstrap_intervals(df, bootstrap_resamples, seed) if bootstrap_resamples > 0 else None
+    summary_df = summary_table(df, intervals)
+    distributions = {
+        column: distribution_table(df, column, intervals)
+        for column in ["year", "final_interpretation", "management_plan"]
+    }
 
     summary_csv = outdir / "01_summary_metrics.csv"
     year_csv = outdir / "02_yearly_case_volume.csv"
@@ -162,35 +370,23 @@ def generate_descriptive_report(input_csv: Path, outdir_root: Path) -> dict[str,
     md_path = outdir / "AVS_Descriptive_Report.md"
 
     summary_df.to_csv(summary_csv, index=False)
-
-    if not df.empty and "year" in df.columns:
-        df.groupby("year", dropna=True).size().reset_index(name="cases").to_csv(year_csv, index=False)
-    else:
-        pd.DataFrame(columns=["year", "cases"]).to_csv(year_csv, index=False)
-
-    if not df.empty and "final_interpretation" in df.columns:
-        (
-            df["final_interpretation"]
-            .value_counts(dropna=False)
-            .rename_axis("final_interpretation")
-            .reset_index(name="cases")
-            .to_csv(interp_csv, index=False)
+    distributions["year"].to_csv(year_csv, index=False)
+    distributions["final_interpretation"].to_csv(interp_csv, index=False)
+    distributions["management_plan"].to_csv(plan_csv, index=False)
+
+    bootstrap_note = None
+    if intervals is not None:
+        bootstrap_note = (
+            f"95% CIs: percentile bootstrap, {bootstrap_resamples} resamples, seed {seed}; "
+            "category CIs are for the percentage of cases."
         )
-    else:
-        pd.DataFrame(columns=["final_interpretation", "cases"]).to_csv(interp_csv, index=False)
-
-    if not df.empty and "management_plan" in df.columns:
-        (
-            df["management_plan"]
-            .value_counts(dropna=False)
-            .rename_axis("management_plan")
-            .reset_index(name="cases")
-            .to_csv(plan_csv, index=False)
-        )
-    else:
-        pd.DataFrame(columns=["management_plan", "cases"]).to_csv(plan_csv, index=False)
-
-    write_markdown_report(df=df, summary_df=summary_df, out_md=md_path)
+    write_markdown_report(
+        df=df,
+        summary_df=summary_df,
+        out_md=md_path,
+        distributions=distributions,
+        bootstrap_note=bootstrap_note,
+    )
 
     return {
         "run_dir": outdir,
@@ -204,7 +400,12 @@ def generate_descriptive_report(input_csv: Path, outdir_root: Path) -> dict[str,
 
 def main() -> None:
     args = parse_args()
-    artifacts = generate_descriptive_report(input_csv=args.input, outdir_root=args.outdir)
+    artifacts = generate_descriptive_report(
+        input_csv=args.input,
+        outdir_root=args.outdir,
+        bootstrap_resamples=args.bootstrap_resamples,
+        seed=args.seed,
+    )
 
     print("Generated report artifacts:")
     print(f"- {artifacts['summary_csv']}")
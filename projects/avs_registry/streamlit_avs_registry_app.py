@@ -2,21 +2,41 @@
 """Streamlit AVS registry template: CSV-backed data entry + descriptive dashboard."""
 from __future__ import annotations
 
+from contextlib import contextmanager
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+import os
+import time
 import uuid
 
 import pandas as pd
 import streamlit as st
 
-from reporting.generate_descriptive_report import generate_descriptive_report
+from instrumentation import configure, file_size, is_enabled, metrics_paths, reset, span, summary_frame, timed
+from notes_index import load_or_build_index, search_index, update_index_on_append
+from registry_cube import (
+    CUBE_DIMENSIONS,
+    CUBE_MEASURES,
+    CUBE_RATES,
+    load_or_build_cube,
+    pivot_cube,
+    registry_signature,
+    rollup,
+    slice_cube,
+    update_cube_on_append,
+)
+from reporting.data_quality_audit import audit_registry, audit_summary, generate_audit_report
+from reporting.generate_descriptive_report import BOOTSTRAP_SEED, generate_descriptive_report
 
 
 REPO_ROOT = Path(__file__).resolve().parent
 DEFAULT_DATA_PATH = REPO_ROOT / "data" / "avs" / "avs_registry.csv"
 DEFAULT_TEMPLATE_PATH = REPO_ROOT / "data" / "avs" / "avs_registry_template.csv"
 DEFAULT_REPORTING_OUTDIR = REPO_ROOT / "reporting" / "outputs"
+REGISTRY_LOCK_TIMEOUT_S = 60.0
+# A lock file older than this is assumed to be left behind by a crashed writer.
+REGISTRY_LOCK_STALE_S = 300.0
 
 CSV_COLUMNS = [
     "record_id",
@@ -49,6 +69,8 @@ CSV_COLUMNS = [
     "notes",
 ]
 
+SEX_OPTIONS = ["Female", "Male", "Other"]
+
 INTERPRETATION_OPTIONS = [
     "Unilateral right",
     "Unilateral left",
@@ -77,6 +99,7 @@ def ensure_dataset(path: Path) -> None:
     pd.DataFrame(columns=CSV_COLUMNS).to_csv(path, index=False)
 
 
+@timed(bytes_read=lambda result, path: file_size(path))
 def load_data(path: Path) -> pd.DataFrame:
     ensure_dataset(path)
     df = pd.read_csv(path)
@@ -161,14 +184,54 @@ def validate_entry(row: dict[str, Any]) -> list[str]:
     return errors
 
 
+@contextmanager
+def registry_lock(path: Path) -> Iterator[None]:
+    """Serialize read-modify-write appends across app sessions and processes with a lock file."""
+    lock_path = path.with_suffix(".lock")
+    deadline = time.monotonic() + REGISTRY_LOCK_TIMEOUT_S
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > REGISTRY_LOCK_STALE_S:
+                    lock_path.unlink(missing_ok=True)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Registry is locked by another writer: {lock_path}")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        lock_path.unlink(missing_ok=True)
+
+
+@timed(rows=lambda result, path, rows: len(rows), bytes_written=lambda result, path, rows: file_size(path))
+def append_rows(path: Path, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with registry_lock(path):
+        df = load_data(path)
+        previous_signature = registry_signature(path)
+        new_rows = pd.DataFrame(rows)
+        updated = pd.concat([df, new_rows], ignore_index=True)
+        tmp = path.with_suffix(".tmp")
+        updated.to_csv(tmp, index=False)
+        tmp.replace(path)
+        update_cube_on_append(path, typed_frame(new_rows.reindex(columns=CSV_COLUMNS)), previous_signature)
+        update_index_on_append(path, new_rows, previous_signature, first_row=len(df))
+
+
 def append_row(path: Path, row: dict[str, Any]) -> None:
-    df = load_data(path)
-    updated = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    tmp = path.with_suffix(".tmp")
-    updated.to_csv(tmp, index=False)
-    tmp.replace(path)
+    append_rows(path, [row])
 
 
+@timed()
 def typed_frame(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
@@ -193,6 +256,11 @@ def typed_frame(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
+def filter_by_date(df: pd.DataFrame, start_date: date, end_date: date) -> pd.DataFrame:
+    return df[(df["procedure_date"].dt.date >= start_date) & (df["procedure_date"].dt.date <= end_date)].copy()
+
+
+@timed("render:entry_tab")
 def entry_tab(data_path: Path) -> None:
     st.subheader("AVS Data Entry")
     st.caption("Data are appended to CSV automatically after validation.")
@@ -202,7 +270,7 @@ def entry_tab(data_path: Path) -> None:
         with c1:
             patient_code = st.text_input("Patient Study Code*", placeholder="AVS_0001")
             age_years = st.number_input("Age (years)*", min_value=18, max_value=100, value=52, step=1)
-            sex = st.selectbox("Sex*", options=["Female", "Male", "Other"])
+            sex = st.selectbox("Sex*", options=SEX_OPTIONS)
             bmi_kg_m2 = st.number_input("BMI (kg/m2)", min_value=10.0, max_value=80.0, value=26.0, step=0.1)
         with c2:
             procedure_date = st.date_input("Procedure Date*", value=date.today())
@@ -281,11 +349,39 @@ def entry_tab(data_path: Path) -> None:
             for err in errors:
                 st.error(err)
         else:
-            append_row(data_path, row)
-            st.success(f"Saved case {row['record_id']} to {data_path}.")
+            try:
+                append_row(data_path, row)
+            except TimeoutError:
+                st.error("The registry is busy with another write (for example a large ingest batch). Try saving again.")
+            else:
+                st.success(f"Saved case {row['record_id']} to {data_path}.")
+
+
+def _render_record_search(df: pd.DataFrame, notes_index: dict, display_cols: list[str]) -> None:
+    query = st.text_input(
+        "Search notes, operator, referring service",
+        placeholder="e.g. cosyntropin infusion hematoma",
+        key="record_search_query",
+    )
+    if not query.strip():
+        return
+    # Drop positions past the loaded frame in case the registry was re-initialized since the index was loaded.
+    hits, n_matches = search_index(notes_index, query)
+    hits = [hit for hit in hits if hit[0] < len(df)]
+    if not hits:
+        st.info("No matching records.")
+        return
+    positions, scores = zip(*hits)
+    matches = df.iloc[list(positions)].assign(search_score=[round(score, 2) for score in scores])
+    if n_matches > len(matches):
+        st.caption(f"Top {len(matches)} of {n_matches} matching records, ranked by relevance.")
+    else:
+        st.caption(f"{len(matches)} matching record(s), ranked by relevance.")
+    st.dataframe(matches[["search_score", *display_cols, "notes"]], use_container_width=True)
 
 
-def review_tab(df: pd.DataFrame, data_path: Path) -> None:
+@timed("render:review_tab")
+def review_tab(df: pd.DataFrame, data_path: Path, notes_index: dict) -> None:
     st.subheader("Record Review and Export")
     if df.empty:
         st.warning("No records found. Add the first case in the Data Entry tab.")
@@ -305,6 +401,7 @@ def review_tab(df: pd.DataFrame, data_path: Path) -> None:
         "bilateral_selective",
         "complication",
     ]
+    _render_record_search(df, notes_index, display_cols)
     st.dataframe(df[display_cols].sort_values("procedure_date", ascending=False), use_container_width=True)
 
     csv_bytes = df.to_csv(index=False).encode("utf-8")
@@ -318,7 +415,74 @@ def review_tab(df: pd.DataFrame, data_path: Path) -> None:
     st.caption(f"Current data source: {data_path}")
 
 
-def dashboard_tab(df: pd.DataFrame) -> None:
+CUBE_DIMENSION_LABELS = {
+    "month": "Month",
+    "operator_name": "Operator",
+    "final_interpretation": "Final interpretation",
+    "management_plan": "Management plan",
+    "sex": "Sex",
+    "cosyntropin_used": "Cosyntropin used",
+}
+
+
+def _render_cube_drilldown(cube: pd.DataFrame, start_date: date, end_date: date) -> None:
+    st.markdown("### Stratified Drill-down")
+    st.caption("Served from the pre-aggregated registry cube (monthly granularity).")
+    start_month = pd.Period(start_date, freq="M").strftime("%Y-%m")
+    end_month = pd.Period(end_date, freq="M").strftime("%Y-%m")
+    in_range = cube[(cube["month"] >= start_month) & (cube["month"] <= end_month)]
+    if in_range.empty:
+        st.info("No cube cells in selected date range.")
+        return
+
+    filters: dict[str, list[str]] = {}
+    filter_cols = st.columns(len(CUBE_DIMENSIONS) - 1)
+    for col, dim in zip(filter_cols, CUBE_DIMENSIONS[1:]):
+        with col:
+            filters[dim] = st.multiselect(
+                CUBE_DIMENSION_LABELS[dim],
+                options=sorted(in_range[dim].unique()),
+                key=f"cube_filter_{dim}",
+            )
+    sliced = slice_cube(in_range, filters)
+    if sliced.empty:
+        st.info("No records match the selected strata.")
+        return
+
+    totals = rollup(sliced, []).iloc[0]
+    d1, d2, d3, d4 = st.columns(4)
+    d1.metric("Cases in stratum", int(totals["cases"]))
+    d2.metric("Mean age", "n/a" if pd.isna(totals["mean_age_years"]) else f"{totals['mean_age_years']:.1f}")
+    d3.metric(
+        "Bilateral selective rate",
+        "n/a" if pd.isna(totals["bilateral_selective_percent"]) else f"{totals['bilateral_selective_percent']:.1f}%",
+    )
+    d4.metric(
+        "Complication rate",
+        "n/a" if pd.isna(totals["complication_percent"]) else f"{totals['complication_percent']:.1f}%",
+    )
+
+    p1, p2, p3 = st.columns(3)
+    with p1:
+        pivot_rows = st.selectbox(
+            "Pivot rows", options=CUBE_DIMENSIONS, format_func=CUBE_DIMENSION_LABELS.get, key="cube_pivot_rows"
+        )
+    with p2:
+        pivot_cols = st.selectbox(
+            "Pivot columns",
+            options=[dim for dim in CUBE_DIMENSIONS if dim != pivot_rows],
+            format_func=CUBE_DIMENSION_LABELS.get,
+            key="cube_pivot_cols",
+        )
+    with p3:
+        pivot_value = st.selectbox(
+            "Pivot value", options=["cases", *CUBE_RATES, *CUBE_MEASURES[1:]], key="cube_pivot_value"
+        )
+    st.dataframe(pivot_cube(sliced, pivot_rows, pivot_cols, pivot_value), use_container_width=True)
+
+
+@timed("render:dashboard_tab")
+def dashboard_tab(df: pd.DataFrame, cube: pd.DataFrame) -> None:
     st.subheader("Descriptive Dashboard")
     if df.empty:
         st.warning("No records available for dashboard rendering.")
@@ -332,7 +496,7 @@ def dashboard_tab(df: pd.DataFrame) -> None:
     with c2:
         end_date = st.date_input("End date", value=max_date, min_value=min_date, max_value=max_date)
 
-    filtered = df[(df["procedure_date"].dt.date >= start_date) & (df["procedure_date"].dt.date <= end_date)].copy()
+    filtered = filter_by_date(df, start_date, end_date)
     if filtered.empty:
         st.info("No records in selected date range.")
         return
@@ -355,11 +519,72 @@ def dashboard_tab(df: pd.DataFrame) -> None:
     st.markdown("**Management Plan Distribution**")
     st.bar_chart(plan)
 
+    st.divider()
+    _render_cube_drilldown(cube, start_date, end_date)
+
+
+def _cached_audit(df: pd.DataFrame, data_path: Path, signature: list[int] | None) -> pd.DataFrame:
+    """Audit findings for this registry version, reused across reruns until the registry or the date changes."""
+    cache_key = [str(data_path), signature, date.today().isoformat()]
+    cached = st.session_state.get("data_quality_audit")
+    if signature is not None and cached is not None and cached["key"] == cache_key:
+        return cached["findings"]
+    with span("audit_registry", rows=len(df)):
+        findings = audit_registry(df)
+    st.session_state["data_quality_audit"] = {"key": cache_key, "findings": findings}
+    return findings
+
+
+@timed("render:data_quality_panel")
+def data_quality_panel(df: pd.DataFrame, data_path: Path, signature: list[int] | None) -> None:
+    st.markdown("### Data Quality Audit")
+    st.caption(
+        "Whole-registry checks: duplicate patient/date pairs, implausible hormone values, "
+        "overdue 3-month outcomes, and interpretation vs lateralization index."
+    )
+    if df.empty:
+        st.info("No records available for auditing.")
+        return
+    if not st.checkbox("Run data quality audit", value=False, key="run_data_quality_audit"):
+        return
+
+    findings = _cached_audit(df, data_path, signature)
+    a1, a2, a3 = st.columns(3)
+    a1.metric("Findings", int(len(findings)))
+    a2.metric("Records flagged", int(findings["record_id"].nunique()))
+    a3.metric("Errors", int((findings["severity"] == "error").sum()))
+    if findings.empty:
+        st.success("No data-quality findings.")
+        return
+
+    st.dataframe(audit_summary(findings), use_container_width=True)
+    checks = st.multiselect("Show checks", options=sorted(findings["check"].unique()), key="audit_check_filter")
+    shown = findings[findings["check"].isin(checks)] if checks else findings
+    st.dataframe(shown, use_container_width=True)
+
+    if st.button("Write Audit Findings to Reporting Output"):
+        try:
+            with span("generate_audit_report") as timing:
+                artifacts = generate_audit_report(input_csv=data_path, outdir_root=DEFAULT_REPORTING_OUTDIR)
+                timing["bytes_read"] = file_size(data_path)
+                timing["bytes_written"] = _artifact_bytes(artifacts)
+            st.success(f"Audit written to: {artifacts['run_dir']}")
+        except Exception as exc:
+            st.error(f"Audit export failed: {exc}")
+
+
+def _artifact_bytes(artifacts: dict[str, Path]) -> int:
+    return sum(file_size(path) or 0 for key, path in artifacts.items() if key != "run_dir")
+
 
 def _recent_report_runs(report_root: Path, limit: int = 20) -> list[Path]:
     if not report_root.exists():
         return []
-    runs = [path for path in report_root.iterdir() if path.is_dir() and path.name.startswith("avs_descriptive_")]
+    runs = [
+        path
+        for path in report_root.iterdir()
+        if path.is_dir() and path.name.startswith(("avs_descriptive_", "avs_audit_"))
+    ]
     runs.sort(key=lambda path: path.stat().st_mtime, reverse=True)
     return runs[:limit]
 
@@ -371,6 +596,8 @@ def _run_artifact_paths(run_dir: Path) -> list[Path]:
         run_dir / "03_interpretation_distribution.csv",
         run_dir / "04_management_distribution.csv",
         run_dir / "AVS_Descriptive_Report.md",
+        run_dir / "01_audit_findings.csv",
+        run_dir / "02_audit_summary.csv",
     ]
     existing = [p for p in preferred if p.exists()]
     if existing:
@@ -410,6 +637,7 @@ def _render_report_history_panel(report_root: Path) -> None:
             )
 
 
+@timed("render:reporting_tab")
 def reporting_tab(data_path: Path) -> None:
     st.subheader("Report Generation")
     st.caption("Generate timestamped, manuscript-ready descriptive artifacts from the current registry CSV.")
@@ -417,12 +645,27 @@ def reporting_tab(data_path: Path) -> None:
     report_root_input = st.text_input("Reporting Output Root", value=str(DEFAULT_REPORTING_OUTDIR))
     report_root = Path(report_root_input).expanduser()
 
+    b1, b2, b3 = st.columns(3)
+    with b1:
+        include_ci = st.checkbox("Include bootstrap 95% CIs", value=False)
+    with b2:
+        bootstrap_resamples = st.number_input(
+            "Bootstrap resamples", min_value=100, max_value=20000, value=2000, step=100, disabled=not include_ci
+        )
+    with b3:
+        bootstrap_seed = st.number_input("Bootstrap seed", min_value=0, value=BOOTSTRAP_SEED, step=1, disabled=not include_ci)
+
     if st.button("Generate Descriptive Report Artifacts"):
         try:
-            artifacts = generate_descriptive_report(
-                input_csv=data_path,
-                outdir_root=report_root,
-            )
+            with span("generate_descriptive_report") as timing:
+                artifacts = generate_descriptive_report(
+                    input_csv=data_path,
+                    outdir_root=report_root,
+                    bootstrap_resamples=int(bootstrap_resamples) if include_ci else 0,
+                    seed=int(bootstrap_seed),
+                )
+                timing["bytes_read"] = file_size(data_path)
+                timing["bytes_written"] = _artifact_bytes(artifacts)
             st.success(f"Report generated in: {artifacts['run_dir']}")
             st.write("Generated files:")
             st.code(
@@ -453,7 +696,7 @@ def reporting_tab(data_path: Path) -> None:
 
 def init_sidebar() -> Path:
     st.sidebar.header("Configuration")
-    data_path_input = st.sidebar.text_input("Registry CSV Path", value=str(DEFAULT_DATA_PATH))
+    data_path_input = st.sidebar.text_input("Registry CSV Path", value=str(DEFAULT_DATA_PATH), key="registry_csv_path")
     data_path = Path(data_path_input).expanduser()
 
     if st.sidebar.button("Initialize Empty Registry"):
@@ -465,23 +708,76 @@ def init_sidebar() -> Path:
     return data_path
 
 
+def _apply_instrumentation_settings() -> None:
+    configure(
+        enabled=st.session_state["instrumentation_enabled"],
+        trace_memory=st.session_state["instrumentation_trace_memory"],
+    )
+
+
+def admin_instrumentation_panel() -> Any:
+    """Sidebar toggles for hot-path timing; returns a container filled with the summary after the tabs render."""
+    # Settings are process-wide: only an explicit toggle changes them, so other open sessions are unaffected.
+    st.session_state.setdefault("instrumentation_enabled", is_enabled())
+    st.session_state.setdefault("instrumentation_trace_memory", False)
+    with st.sidebar.expander("Admin: Performance Metrics", expanded=False):
+        st.checkbox(
+            "Enable timing instrumentation",
+            key="instrumentation_enabled",
+            on_change=_apply_instrumentation_settings,
+        )
+        st.checkbox(
+            "Trace peak memory (slower)",
+            key="instrumentation_trace_memory",
+            on_change=_apply_instrumentation_settings,
+        )
+        if st.button("Reset In-Memory Metrics"):
+            reset()
+        return st.container()
+
+
+def _render_instrumentation_summary(container: Any) -> None:
+    with container:
+        if not is_enabled():
+            st.caption("Instrumentation is off.")
+            return
+        summary = summary_frame()
+        if summary.empty:
+            st.caption("No calls recorded yet.")
+        else:
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+        paths = metrics_paths()
+        st.caption(f"JSON lines: {paths['jsonl']}")
+        st.caption(f"Prometheus textfile: {paths['prometheus']}")
+
+
 def main() -> None:
     st.set_page_config(page_title="AVS Research Registry", layout="wide")
     st.title("AVS Research Registry Template")
     st.caption("Structured Streamlit data-entry template with CSV backend and descriptive analytics.")
 
     data_path = init_sidebar()
+    metrics_container = admin_instrumentation_panel()
+    # Taken before loading so derived sidecars are never labelled with a newer registry version.
+    signature = registry_signature(data_path)
     df = typed_frame(load_data(data_path))
+    with span("load_or_build_cube", rows=len(df)):
+        cube = load_or_build_cube(data_path, df, signature)
+    with span("load_or_build_index", rows=len(df)):
+        notes_index = load_or_build_index(data_path, df, signature)
 
     tab1, tab2, tab3, tab4 = st.tabs(["Data Entry", "Review / Export", "Dashboard", "Reporting"])
     with tab1:
         entry_tab(data_path)
     with tab2:
-        review_tab(df, data_path)
+        review_tab(df, data_path, notes_index)
     with tab3:
-        dashboard_tab(df)
+        dashboard_tab(df, cube)
+        st.divider()
+        data_quality_panel(df, data_path, signature)
     with tab4:
         reporting_tab(data_path)
+    _render_instrumentation_summary(metrics_container)
 
 
 if __name__ == "__main__":